@@ -1,18 +1,129 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import boto3
-from botocore.exceptions import NoCredentialsError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import NoCredentialsError, ClientError
 from fastapi import File, UploadFile
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from starlette.config import Config
 
 config = Config('.env')
 SQLALCHEMY_DATABASE_URL = config('SQLALCHEMY_DATABASE_URL')
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# 커넥션 풀 설정
+DB_POOL_SIZE = config('DB_POOL_SIZE', cast=int, default=5)
+DB_MAX_OVERFLOW = config('DB_MAX_OVERFLOW', cast=int, default=10)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', cast=int, default=30)
+DB_POOL_RECYCLE = config('DB_POOL_RECYCLE', cast=int, default=1800)
+DB_POOL_PRE_PING = config('DB_POOL_PRE_PING', cast=bool, default=True)
+
+
+# 커넥션 풀 사용 지표
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_count = 0
+        self.wait_count = 0
+        self.timeout_count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_checkout = 0.0
+        self.max_checkout = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_count += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeout_count += 1
+
+    def record_checkout(self, seconds: float):
+        with self._lock:
+            self.checkout_count += 1
+            self.total_checkout += seconds
+            self.max_checkout = max(self.max_checkout, seconds)
+
+    def snapshot(self, pool):
+        with self._lock:
+            checkout_count = self.checkout_count
+            wait_count = self.wait_count  # 타임아웃된 시도까지 포함
+            return {
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "in_use": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "checkout_count": checkout_count,
+                "timeout_count": self.timeout_count,
+                "avg_checkout_ms": self.total_checkout / checkout_count * 1000 if checkout_count else 0,
+                "max_checkout_ms": self.max_checkout * 1000,
+                "avg_wait_ms": self.total_wait / wait_count * 1000 if wait_count else 0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    # 풀에서 커넥션을 꺼내기까지 대기한 시간
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    # pre-ping 등을 포함한 전체 checkout 시간
+    def connect(self):
+        start = time.perf_counter()
+        connection = super().connect()
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics()
+
+
+pool_options = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=InstrumentedQueuePool, **pool_options)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 비동기 엔진 (기본값: 동기 URL의 드라이버를 asyncpg로 변경, 테스트 시 sqlite+aiosqlite 등으로 지정)
+SQLALCHEMY_ASYNC_DATABASE_URL = config(
+    'SQLALCHEMY_ASYNC_DATABASE_URL',
+    default=SQLALCHEMY_DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://', 1)
+)
+
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **pool_options)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -21,22 +132,93 @@ ACCESS_KEY = config('S3_ACCESS_KEY')
 SECRET_KEY = config('S3_SECRET_KEY')
 BUCKET_NAME = 'do-run'
 
+S3_ENDPOINT_URL = config('S3_ENDPOINT_URL', default=None)  # 로컬 S3 대체 서버(moto 등) 사용 시 지정
+S3_UPLOAD_CONCURRENCY = config('S3_UPLOAD_CONCURRENCY', cast=int, default=8)
+S3_MULTIPART_THRESHOLD = config('S3_MULTIPART_THRESHOLD', cast=int, default=8 * 1024 * 1024)
+S3_MULTIPART_CHUNKSIZE = config('S3_MULTIPART_CHUNKSIZE', cast=int, default=8 * 1024 * 1024)
+S3_TRANSFER_CONCURRENCY = config('S3_TRANSFER_CONCURRENCY', cast=int, default=4)  # 파일 하나당 multipart 동시 전송 수
+
 s3 = boto3.client('s3', aws_access_key_id=ACCESS_KEY,
-                  aws_secret_access_key=SECRET_KEY)
+                  aws_secret_access_key=SECRET_KEY,
+                  endpoint_url=S3_ENDPOINT_URL)
+
+# 임계값 이상의 파일은 메모리에 올리지 않고 multipart로 나누어 스트리밍 업로드
+s3_transfer_config = TransferConfig(multipart_threshold=S3_MULTIPART_THRESHOLD,
+                                    multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+                                    max_concurrency=S3_TRANSFER_CONCURRENCY)
+
+# 업로드는 이벤트 루프를 막지 않도록 동시 실행 개수가 제한된 별도 스레드에서 수행
+s3_upload_executor = ThreadPoolExecutor(max_workers=S3_UPLOAD_CONCURRENCY, thread_name_prefix='s3-upload')
 
 
 async def upload_file(file_name: str, file: UploadFile = File(...)):
     try:
-        s3.upload_fileobj(file.file, BUCKET_NAME, file_name)
-        file_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{file_name}"
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            s3_upload_executor,
+            partial(s3.upload_fileobj, file.file, BUCKET_NAME, file_name,
+                    ExtraArgs={"ContentType": file.content_type}, Config=s3_transfer_config)
+        )
+        file_url = get_file_url(file_name)
         return file_url
     except NoCredentialsError:
         return "Credentials not available"
 
 
+# S3로 직접 업로드할 수 있는 presigned POST 발급 (Content-Type과 크기 조건 포함)
+def create_presigned_upload(file_name: str, content_type: str, max_size: int, expires_in: int = 300):
+    return s3.generate_presigned_post(
+        Bucket=BUCKET_NAME,
+        Key=file_name,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_size],
+        ],
+        ExpiresIn=expires_in
+    )
+
+
+# 업로드된 파일의 메타데이터 조회 (없으면 None)
+def get_uploaded_file(file_name: str):
+    try:
+        return s3.head_object(Bucket=BUCKET_NAME, Key=file_name)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+# 메모리에 있는 데이터를 S3에 업로드 (변형 이미지 등 작은 파일용)
+def upload_bytes(file_name: str, data: bytes, content_type: str):
+    s3.put_object(Bucket=BUCKET_NAME, Key=file_name, Body=data, ContentType=content_type)
+
+
+# S3에 업로드된 파일 내용 가져오기
+def download_file(file_name: str):
+    response = s3.get_object(Bucket=BUCKET_NAME, Key=file_name)
+    return response["Body"].read()
+
+
+def get_file_url(file_name: str):
+    return f"https://{BUCKET_NAME}.s3.amazonaws.com/{file_name}"
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_status():
+    return {
+        "sync": InstrumentedQueuePool.metrics.snapshot(engine.pool),
+        "async": InstrumentedAsyncQueuePool.metrics.snapshot(async_engine.sync_engine.pool),
+    }
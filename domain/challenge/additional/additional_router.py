@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from domain.challenge import challenge_crud
+from domain.desc.utils import verify_uploaded_image
 from domain.user.user_crud import get_current_user
 from models import User, AdditionalGoal
 
@@ -25,10 +26,20 @@ def complete_additional_goal(additional_goal_no: int, image_file_nm: str, db: Se
     if goal.CHALLENGE_USER.USER.USER_NO != current_user.USER_NO:
         raise HTTPException(status_code=401, detail="수정 권한이 없습니다.")
 
+    # 직접 업로드한 이미지가 실제로 존재하는지 확인한 뒤 저장
+    if image_file_nm:
+        verify_uploaded_image(image_file_nm, current_user.UID)
+
+    was_done = goal.IS_DONE
+
     goal.IS_DONE = True
     goal.IMAGE_FILE_NM = image_file_nm
     goal.END_DT = datetime.datetime.utcnow() + datetime.timedelta(hours=24)
 
+    if not was_done:
+        challenge_crud.update_challenge_user_stats(db, goal.CHALLENGE_USER, additional_done_delta=1,
+                                                   additional_failed_delta=-1)
+
     db.commit()
 
     return {"message": "추가목표 완료"}
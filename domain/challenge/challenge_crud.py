@@ -1,25 +1,46 @@
 from datetime import datetime, timedelta, date
 import random
 from math import ceil
-from typing import Type
+from typing import Type, List
 
 from fastapi import HTTPException
-from sqlalchemy import func, Integer, and_
+from sqlalchemy import func, Integer, and_, select, update, delete, insert, cast, literal, true
+from sqlalchemy.dialects.postgresql import array, insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload, aliased
 
 from domain.challenge.challenge_schema import ChallengeCreate, ChallengeParticipant, \
     AdditionalGoalPydantic, ChallengeInvite, \
     ChallengeUserList, GetChallengeUserDetail, ChallengeUserListModel, GetChallengeHistory, EmojiUser, DiaryPydantic, \
-    ItemPydantic, UserStatus
-from domain.desc.utils import calculate_challenge_progress
-from domain.user.user_crud import get_user_by_uid, get_equipped_avatar
+    ItemPydantic, UserStatus, ChallengeFeed
+from domain.desc.catalog import catalog
+from domain.desc.utils import calculate_challenge_progress, get_image_variant_urls, get_image_variant_urls_async
+from domain.user.user_crud import get_user_by_uid, get_equipped_avatar, get_equipped_avatars
 from models import ChallengeMaster, User, ChallengeUser, PersonDailyGoal, AdditionalGoal, ItemUser, \
-    Item, InviteAcceptType, PersonDailyGoalComplete, AvatarType, ChallengeStatusType, \
-    DailyCompleteUser
+    InviteAcceptType, PersonDailyGoalComplete, AvatarType, ChallengeStatusType, \
+    DailyCompleteUser, ChallengeUserStats, Item
+
+# 챌린지 시작 시 참가자에게 배정되는 코멘트
+CHALLENGE_COMMENTS = [
+    "하루 하루가 소중해요.",
+    "늘 최선을 다하세요!",
+    "긍정의 힘이 당신을 이끌어요.",
+    "오늘도 멋진 하루가 되길 바랍니다.",
+    "작은 성공이 큰 기쁨으로 이어지길."
+]
+
+
+# 챌린지 시작/종료 타이머 갱신 알림 채널 (challenge_scheduler에서 LISTEN)
+CHALLENGE_TIMER_CHANNEL = 'challenge_timers'
 
 
 # 기능 함수
+# 챌린지 일정이 바뀌었음을 스케줄러에 알림 (NOTIFY는 트랜잭션이 커밋될 때 전달됨)
+def notify_challenge_timer(db: Session, challenge_mst_no: int):
+    db.execute(select(func.pg_notify(CHALLENGE_TIMER_CHANNEL, str(challenge_mst_no))))
+
+
 # Challenge Master 객체를 Challenge Mst No로 가져오기
 def get_challenge_master_by_id(db: Session, challenge_mst_no: int) -> Type[ChallengeMaster]:
     challenge = db.query(ChallengeMaster).filter(ChallengeMaster.CHALLENGE_MST_NO == challenge_mst_no).first()
@@ -33,71 +54,195 @@ def get_challenge_master_by_id(db: Session, challenge_mst_no: int) -> Type[Chall
     return challenge
 
 
-# 개인의 챌린지 진행도 계산
-def calculate_user_progress(db: Session, challenge_user_no: int):
+# 챌린지 유저들의 일기/추가목표 집계를 한 번에 조회
+# 일기/추가목표를 각각 미리 집계한 서브쿼리와 조인하므로 조인으로 인한 행 증폭이 발생하지 않음
+def get_users_goal_stats(db: Session, challenge_mst_no: int = None, challenge_user_nos: List[int] = None):
+    if challenge_mst_no is None and challenge_user_nos is None:
+        raise ValueError("challenge_mst_no 또는 challenge_user_nos가 필요합니다.")
+
+    if challenge_user_nos is not None and not challenge_user_nos:
+        return []
+
     try:
-        # 챌린지 마스터의 시작 및 종료 날짜만 선택
-        challenge_master = db.query(ChallengeMaster.START_DT, ChallengeMaster.END_DT).filter(
-            ChallengeMaster.USERS.any(CHALLENGE_USER_NO=challenge_user_no)).first()
+        # 대상 챌린지 유저 범위
+        if challenge_mst_no is not None:
+            target_users = select(ChallengeUser.CHALLENGE_USER_NO).where(
+                ChallengeUser.CHALLENGE_MST_NO == challenge_mst_no)
+        else:
+            target_users = select(ChallengeUser.CHALLENGE_USER_NO).where(
+                ChallengeUser.CHALLENGE_USER_NO.in_(challenge_user_nos))
+
+        # 일일 목표(일기) 완료 개수
+        daily_stats = db.query(
+            PersonDailyGoalComplete.CHALLENGE_USER_NO.label("CHALLENGE_USER_NO"),
+            func.count(PersonDailyGoalComplete.DAILY_COMPLETE_NO).label("DAILY_COMPLETED")
+        ).filter(
+            PersonDailyGoalComplete.CHALLENGE_USER_NO.in_(target_users)
+        ).group_by(PersonDailyGoalComplete.CHALLENGE_USER_NO).subquery()
+
+        # 추가 목표 성공/실패 개수
+        additional_stats = db.query(
+            AdditionalGoal.CHALLENGE_USER_NO.label("CHALLENGE_USER_NO"),
+            func.sum(func.cast(AdditionalGoal.IS_DONE, Integer)).label("ADDITIONAL_COMPLETED"),
+            func.sum(func.cast(AdditionalGoal.IS_DONE == False, Integer)).label("ADDITIONAL_FAILED")
+        ).filter(
+            AdditionalGoal.CHALLENGE_USER_NO.in_(target_users)
+        ).group_by(AdditionalGoal.CHALLENGE_USER_NO).subquery()
+
+        return db.query(
+            ChallengeUser.CHALLENGE_USER_NO,
+            ChallengeMaster.START_DT,
+            ChallengeMaster.END_DT,
+            func.coalesce(daily_stats.c.DAILY_COMPLETED, 0).label("DAILY_COMPLETED"),
+            func.coalesce(additional_stats.c.ADDITIONAL_COMPLETED, 0).label("ADDITIONAL_COMPLETED"),
+            func.coalesce(additional_stats.c.ADDITIONAL_FAILED, 0).label("ADDITIONAL_FAILED")
+        ).join(
+            ChallengeMaster, ChallengeMaster.CHALLENGE_MST_NO == ChallengeUser.CHALLENGE_MST_NO
+        ).outerjoin(
+            daily_stats, daily_stats.c.CHALLENGE_USER_NO == ChallengeUser.CHALLENGE_USER_NO
+        ).outerjoin(
+            additional_stats, additional_stats.c.CHALLENGE_USER_NO == ChallengeUser.CHALLENGE_USER_NO
+        ).filter(
+            ChallengeUser.CHALLENGE_USER_NO.in_(target_users)
+        ).all()
 
-        if not challenge_master:
-            raise ValueError("챌린지 마스터 정보를 찾을 수 없습니다.")
+    except SQLAlchemyError as e:
+        # 데이터베이스 쿼리 중 발생하는 예외 처리
+        raise ValueError("데이터베이스 처리 중 오류 발생: " + str(e))
 
-        start_dt = challenge_master.START_DT
-        end_dt = challenge_master.END_DT
 
-        # 챌린지 기간 계산
-        day = (end_dt - start_dt).days + 1
+# 집계값으로부터 진행도 계산
+def calculate_progress(start_dt: datetime, end_dt: datetime, daily_goals_completed: int,
+                       additional_goals_completed: int, additional_goals_failed: int):
+    # 챌린지 기간 계산
+    day = (end_dt - start_dt).days + 1
 
-        if day <= 0:
-            raise ValueError("챌린지 기간이 잘못되었습니다.")
+    if day <= 0:
+        raise ValueError("계산 중 오류 발생: 챌린지 기간이 잘못되었습니다.")
 
-        # week = (day // 7) + 1
+    # 진행도 계산
+    daily_progress = (100 / day) * daily_goals_completed
+    additional_progress = (additional_goals_completed - additional_goals_failed) * 5
 
-        # 일일, 주간, 추가 목표 진행도를 단일 쿼리로 계산
-        progress_stats = db.query(
-            func.count(PersonDailyGoalComplete.DAILY_COMPLETE_NO),
-            # func.sum(func.cast(TeamWeeklyGoal.IS_DONE, Integer)),
-            func.sum(func.cast(AdditionalGoal.IS_DONE, Integer)),
-            func.sum(func.cast(AdditionalGoal.IS_DONE == False, Integer))
-        ).select_from(ChallengeUser) \
-            .outerjoin(PersonDailyGoalComplete,
-                       ChallengeUser.CHALLENGE_USER_NO == PersonDailyGoalComplete.CHALLENGE_USER_NO) \
-            .outerjoin(AdditionalGoal, ChallengeUser.CHALLENGE_USER_NO == AdditionalGoal.CHALLENGE_USER_NO) \
-            .filter(ChallengeUser.CHALLENGE_USER_NO == challenge_user_no) \
-            .group_by(ChallengeUser.CHALLENGE_USER_NO).first()
+    return daily_progress + additional_progress
 
-        # .outerjoin(TeamWeeklyGoal, ChallengeUser.CHALLENGE_USER_NO == TeamWeeklyGoal.CHALLENGE_USER_NO) \
 
-        if not progress_stats:
-            raise ValueError("진행도 데이터를 찾을 수 없습니다.")
+# 최근 7일 일기 개수로 참가자 상태 결정
+def get_user_status(weekly_diary_count: int):
+    if weekly_diary_count >= 3:
+        return UserStatus.RUNNING  # '뛰고 있음'
+    if weekly_diary_count >= 1:
+        return UserStatus.WALKING  # '걷고 있음'
+    return UserStatus.SLEEPING
 
-        # daily_goals_completed, weekly_goals_completed, additional_goals_completed, additional_goals_failed = progress_stats
-        daily_goals_completed, additional_goals_completed, additional_goals_failed = progress_stats
 
-        # None 값 처리
-        daily_goals_completed = daily_goals_completed or 0
-        # weekly_goals_completed = weekly_goals_completed or 0
-        additional_goals_completed = additional_goals_completed or 0
-        additional_goals_failed = additional_goals_failed or 0
+# 챌린지 유저들의 진행도를 한 번에 계산 (CHALLENGE_USER_NO -> 진행도)
+def calculate_users_progress(db: Session, challenge_mst_no: int = None, challenge_user_nos: List[int] = None):
+    goal_stats = get_users_goal_stats(db, challenge_mst_no, challenge_user_nos)
 
-        # 진행도 계산
-        daily_progress = (100 / day) * daily_goals_completed
-        # weekly_progress = (15 / week) * weekly_goals_completed
-        additional_progress = (additional_goals_completed - additional_goals_failed) * 5
+    return {
+        stats.CHALLENGE_USER_NO: calculate_progress(stats.START_DT, stats.END_DT, stats.DAILY_COMPLETED,
+                                                    stats.ADDITIONAL_COMPLETED, stats.ADDITIONAL_FAILED)
+        for stats in goal_stats
+    }
 
-        # 전체 진행도 계산
-        # total_progress = daily_progress + weekly_progress + additional_progress
-        total_progress = daily_progress + additional_progress
 
-        return total_progress
+# 챌린지 유저들의 통계를 찾는 쿼리
+def select_challenge_users_stats(challenge_user_nos: List[int]):
+    return select(ChallengeUserStats).where(ChallengeUserStats.CHALLENGE_USER_NO.in_(challenge_user_nos))
 
-    except SQLAlchemyError as e:
-        # 데이터베이스 쿼리 중 발생하는 예외 처리
-        raise ValueError("데이터베이스 처리 중 오류 발생: " + str(e))
-    except ValueError as e:
-        # 기타 계산 또는 데이터 검증 중 발생하는 예외 처리
-        raise ValueError("계산 중 오류 발생: " + str(e))
+
+# 챌린지 유저들의 통계를 한 번에 가져오기 (CHALLENGE_USER_NO -> ChallengeUserStats)
+async def get_challenge_users_stats(db: AsyncSession, challenge_user_nos: List[int]):
+    if not challenge_user_nos:
+        return {}
+
+    result = await db.execute(select_challenge_users_stats(challenge_user_nos))
+
+    return {stats.CHALLENGE_USER_NO: stats for stats in result.scalars().all()}
+
+
+# 일기/추가목표 변경분을 챌린지 유저 통계에 반영 (호출한 쪽의 트랜잭션에서 함께 커밋됨)
+def update_challenge_user_stats(db: Session, challenge_user: ChallengeUser, diary_delta: int = 0,
+                                additional_done_delta: int = 0, additional_failed_delta: int = 0):
+    challenge = challenge_user.CHALLENGE_MST
+
+    # 종료된 챌린지의 최종 결과는 변경하지 않음
+    if challenge.CHALLENGE_STATUS == ChallengeStatusType.COMPLETE:
+        return
+
+    # 동시 요청에도 값이 유실되지 않도록 DB에서 직접 증감
+    diary_count = ChallengeUserStats.DIARY_COUNT + diary_delta
+    additional_done_count = ChallengeUserStats.ADDITIONAL_DONE_COUNT + additional_done_delta
+    additional_failed_count = ChallengeUserStats.ADDITIONAL_FAILED_COUNT + additional_failed_delta
+
+    updated = db.query(ChallengeUserStats).filter(
+        ChallengeUserStats.CHALLENGE_USER_NO == challenge_user.CHALLENGE_USER_NO
+    ).update({
+        ChallengeUserStats.DIARY_COUNT: diary_count,
+        ChallengeUserStats.ADDITIONAL_DONE_COUNT: additional_done_count,
+        ChallengeUserStats.ADDITIONAL_FAILED_COUNT: additional_failed_count,
+        ChallengeUserStats.PROGRESS: calculate_progress(challenge.START_DT, challenge.END_DT, diary_count,
+                                                        additional_done_count, additional_failed_count),
+        ChallengeUserStats.MODIFY_DT: datetime.utcnow()
+    }, synchronize_session=False)
+
+    # 아직 통계가 없는 경우 원본 테이블로부터 생성
+    if not updated:
+        rebuild_challenge_user_stats(db, [challenge_user.CHALLENGE_USER_NO])
+
+
+# 원본 테이블로부터 챌린지 유저 통계를 다시 계산
+# challenge_mst_nos가 있으면 해당 챌린지의 모든 유저, 둘 다 없으면 진행중인 챌린지의 모든 유저
+def rebuild_challenge_user_stats(db: Session, challenge_user_nos: List[int] = None,
+                                 challenge_mst_nos: List[int] = None, chunk_size: int = 1000):
+    # 아직 반영되지 않은 변경사항도 집계에 포함
+    db.flush()
+
+    if challenge_mst_nos is not None:
+        challenge_user_nos = [challenge_user_no for challenge_user_no, in db.query(ChallengeUser.CHALLENGE_USER_NO).filter(
+            ChallengeUser.CHALLENGE_MST_NO.in_(challenge_mst_nos)
+        ).order_by(ChallengeUser.CHALLENGE_USER_NO).all()]
+    elif challenge_user_nos is None:
+        challenge_user_nos = [challenge_user_no for challenge_user_no, in db.query(ChallengeUser.CHALLENGE_USER_NO).join(
+            ChallengeMaster, ChallengeMaster.CHALLENGE_MST_NO == ChallengeUser.CHALLENGE_MST_NO
+        ).filter(
+            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
+            ChallengeMaster.DELETE_YN == False
+        ).all()]
+
+    modify_dt = datetime.utcnow()
+
+    for i in range(0, len(challenge_user_nos), chunk_size):
+        chunk = challenge_user_nos[i:i + chunk_size]
+
+        goal_stats = get_users_goal_stats(db, challenge_user_nos=chunk)
+        if not goal_stats:
+            continue
+
+        # 같은 참가자의 통계를 동시에 처음 만들어도 충돌하지 않도록 upsert
+        stmt = pg_insert(ChallengeUserStats).values([
+            {"CHALLENGE_USER_NO": row.CHALLENGE_USER_NO,
+             "DIARY_COUNT": row.DAILY_COMPLETED,
+             "ADDITIONAL_DONE_COUNT": row.ADDITIONAL_COMPLETED,
+             "ADDITIONAL_FAILED_COUNT": row.ADDITIONAL_FAILED,
+             "PROGRESS": calculate_progress(row.START_DT, row.END_DT, row.DAILY_COMPLETED,
+                                            row.ADDITIONAL_COMPLETED, row.ADDITIONAL_FAILED),
+             "MODIFY_DT": modify_dt}
+            for row in goal_stats
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ChallengeUserStats.CHALLENGE_USER_NO],
+            set_={
+                "DIARY_COUNT": stmt.excluded.DIARY_COUNT,
+                "ADDITIONAL_DONE_COUNT": stmt.excluded.ADDITIONAL_DONE_COUNT,
+                "ADDITIONAL_FAILED_COUNT": stmt.excluded.ADDITIONAL_FAILED_COUNT,
+                "PROGRESS": stmt.excluded.PROGRESS,
+                "MODIFY_DT": stmt.excluded.MODIFY_DT
+            }
+        ))
+
+    return len(challenge_user_nos)
 
 
 # 챌린지에 참가하고 있는 참가자 리스트 반환
@@ -117,12 +262,28 @@ def get_challenge_participants(db: Session, challenge_mst_no):
     return participants
 
 
-# 특정 Challenge User객체의 정보를 challenge mst no와 user_no로 가져오기
-def get_challenge_user_by_user_no(db: Session, challenge_mst_no, user_no):
-    challenge_user = db.query(ChallengeUser).filter(
+# 챌린지에 참가한 특정 사용자의 challenge_user를 찾는 쿼리 (동기/비동기 공용)
+def select_challenge_user_by_user_no(challenge_mst_no, user_no):
+    return select(ChallengeUser).where(
         ChallengeUser.USER_NO == user_no,
         ChallengeUser.CHALLENGE_MST_NO == challenge_mst_no
-    ).first()
+    )
+
+
+# 특정 Challenge User객체의 정보를 challenge mst no와 user_no로 가져오기
+def get_challenge_user_by_user_no(db: Session, challenge_mst_no, user_no):
+    challenge_user = db.execute(select_challenge_user_by_user_no(challenge_mst_no, user_no)).scalars().first()
+
+    if not challenge_user:
+        raise HTTPException(status_code=404, detail="특정 사용자에 대한 challenge_user를 찾을 수 없습니다.")
+
+    return challenge_user
+
+
+# 챌린지에 참가한 특정 사용자의 challenge_user 반환 (비동기)
+async def get_challenge_user_by_user_no_async(db: AsyncSession, challenge_mst_no, user_no):
+    result = await db.execute(select_challenge_user_by_user_no(challenge_mst_no, user_no))
+    challenge_user = result.scalars().first()
 
     if not challenge_user:
         raise HTTPException(status_code=404, detail="특정 사용자에 대한 challenge_user를 찾을 수 없습니다.")
@@ -193,7 +354,8 @@ def get_active_challenges_for_user(db: Session, user_no: int, specified_date: da
     page_size = 1
     offset = (page - 1) * page_size
 
-    user_challenge = db.query(ChallengeMaster).join(
+    # 전체 개수는 같은 쿼리에서 윈도우 함수로 함께 계산 (challenge, total_size)
+    user_challenge = db.query(ChallengeMaster, func.count().over().label("TOTAL_COUNT")).join(
         ChallengeUser,
         ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO
     ).filter(
@@ -202,7 +364,7 @@ def get_active_challenges_for_user(db: Session, user_no: int, specified_date: da
         ChallengeMaster.END_DT >= specified_date,
         ChallengeMaster.DELETE_YN == False,
         ChallengeMaster.CHALLENGE_STATUS != ChallengeStatusType.PENDING
-    ).offset(offset).limit(page_size).first()
+    ).order_by(ChallengeMaster.CHALLENGE_MST_NO).offset(offset).limit(page_size).first()
 
     if not user_challenge:
         # raise HTTPException(status_code=404, detail="해당 날짜에 챌린지 기록이 존재하지 않습니다.")
@@ -384,13 +546,16 @@ def post_create_challenge(db: Session, challenge_create: ChallengeCreate, curren
 
         db_challenge_user = ChallengeUser(
             CHALLENGE_MST=db_challenge,
-            # COMMENT=random.choice(comments),
+            # COMMENT=random.choice(CHALLENGE_COMMENTS),
             USER=user,
             IS_OWNER=current_user == user if True else False,
             ACCEPT_STATUS=InviteAcceptType.ACCEPTED if current_user == user else InviteAcceptType.PENDING
         )
         db.add(db_challenge_user)
 
+    db.flush()
+    notify_challenge_timer(db, db_challenge.CHALLENGE_MST_NO)
+
     db.commit()
     return db_challenge
 
@@ -405,14 +570,6 @@ def start_challenge(db: Session, challenge_mst_no: int, current_user: User, star
     challenge.START_DT = start_dt
     challenge.CHALLENGE_STATUS = ChallengeStatusType.PROGRESS
 
-    comments = [
-        "하루 하루가 소중해요.",
-        "늘 최선을 다하세요!",
-        "긍정의 힘이 당신을 이끌어요.",
-        "오늘도 멋진 하루가 되길 바랍니다.",
-        "작은 성공이 큰 기쁨으로 이어지길."
-    ]
-
     # ACCEPTED 상태가 아닌 ChallengeUser 삭제
     db.query(ChallengeUser).filter(
         ChallengeUser.CHALLENGE_MST_NO == challenge_mst_no,
@@ -423,7 +580,7 @@ def start_challenge(db: Session, challenge_mst_no: int, current_user: User, star
         ChallengeUser.CHALLENGE_MST_NO == challenge_mst_no, ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED
     ).all()
 
-    items = db.query(Item).all()
+    items = catalog.get_items()
 
     # team_leader = random.choice(challenge_users)
     # team_leader.IS_LEADER = True
@@ -436,7 +593,7 @@ def start_challenge(db: Session, challenge_mst_no: int, current_user: User, star
         # )
         # db.add(db_team)
 
-        challenge_user.COMMENT = random.choice(comments)
+        challenge_user.COMMENT = random.choice(CHALLENGE_COMMENTS)
 
         for item in items:
             db_item_user = ItemUser(
@@ -445,157 +602,425 @@ def start_challenge(db: Session, challenge_mst_no: int, current_user: User, star
             )
             db.add(db_item_user)
 
+    # 시작일이 바뀌었으므로 저장된 진행도를 다시 계산
+    rebuild_challenge_user_stats(db, challenge_mst_nos=[challenge_mst_no])
+    notify_challenge_timer(db, challenge_mst_no)
+
     db.commit()
     return {"message": "챌린지가 시작되었습니다"}
 
 
-def start_challenge_server(db: Session, challenge: ChallengeMaster):
-    challenge.CHALLENGE_STATUS = ChallengeStatusType.PROGRESS
-
-    # ACCEPTED 상태가 아닌 ChallengeUser 삭제
-    db.query(ChallengeUser).filter(
-        ChallengeUser.CHALLENGE_MST_NO == challenge.CHALLENGE_MST_NO,
-        ChallengeUser.ACCEPT_STATUS != InviteAcceptType.ACCEPTED
-    ).delete(synchronize_session=False)
+# 챌린지 배치를 집합 연산(UPDATE / DELETE / INSERT ... SELECT)으로 시작 (커밋은 호출하는 쪽에서)
+def start_challenges_batch(db: Session, challenge_mst_nos: List[int]):
+    metrics = {"challenges": 0, "deleted_users": 0, "users": 0, "item_users": 0}
 
-    challenge_users = db.query(ChallengeUser).filter(
-        ChallengeUser.CHALLENGE_MST_NO == challenge.CHALLENGE_MST_NO,
-        ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED
-    ).all()
+    # 아직 대기중인 챌린지만 진행중으로 변경 (중복 실행 시에도 안전)
+    started_nos = db.execute(
+        update(ChallengeMaster).where(
+            ChallengeMaster.CHALLENGE_MST_NO.in_(challenge_mst_nos),
+            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PENDING,
+            ChallengeMaster.DELETE_YN == False
+        ).values(CHALLENGE_STATUS=ChallengeStatusType.PROGRESS)
+        .returning(ChallengeMaster.CHALLENGE_MST_NO)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
 
-    items = db.query(Item).all()
+    if not started_nos:
+        return metrics
 
-    comments = [
-        "하루 하루가 소중해요.",
-        "늘 최선을 다하세요!",
-        "긍정의 힘이 당신을 이끌어요.",
-        "오늘도 멋진 하루가 되길 바랍니다.",
-        "작은 성공이 큰 기쁨으로 이어지길."
-    ]
+    # ACCEPTED 상태가 아닌 ChallengeUser 삭제
+    deleted = db.execute(
+        delete(ChallengeUser).where(
+            ChallengeUser.CHALLENGE_MST_NO.in_(started_nos),
+            ChallengeUser.ACCEPT_STATUS != InviteAcceptType.ACCEPTED
+        ).execution_options(synchronize_session=False)
+    )
 
-    for challenge_user in challenge_users:
-        challenge_user.COMMENT = random.choice(comments)
+    # 참가자별 랜덤 코멘트 배정 (행마다 random() 평가)
+    comment_index = cast(func.floor(func.random() * len(CHALLENGE_COMMENTS)), Integer) + 1
+    updated = db.execute(
+        update(ChallengeUser).where(
+            ChallengeUser.CHALLENGE_MST_NO.in_(started_nos),
+            ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED
+        ).values(COMMENT=array(CHALLENGE_COMMENTS)[comment_index])
+        .execution_options(synchronize_session=False)
+    )
 
-        for item in items:
-            db_item_user = ItemUser(
-                ITEM_NO=item.ITEM_NO,
-                CHALLENGE_USER=challenge_user
+    # 참가자 x 아이템 조합으로 item_user 생성
+    seeded = db.execute(
+        insert(ItemUser).from_select(
+            ["ITEM_NO", "CHALLENGE_USER_NO", "COUNT"],
+            select(Item.ITEM_NO, ChallengeUser.CHALLENGE_USER_NO, literal(0))
+            .select_from(ChallengeUser)
+            .join(Item, true())
+            .where(
+                ChallengeUser.CHALLENGE_MST_NO.in_(started_nos),
+                ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED
             )
-            db.add(db_item_user)
+        )
+    )
 
-    db.commit()
-    return {"message": "챌린지가 시작되었습니다"}
+    metrics["challenges"] = len(started_nos)
+    metrics["deleted_users"] = deleted.rowcount
+    metrics["users"] = updated.rowcount
+    metrics["item_users"] = seeded.rowcount
+    return metrics
 
 
 def end_challenge_server(db: Session, challenge: ChallengeMaster):
     challenge.CHALLENGE_STATUS = ChallengeStatusType.COMPLETE
 
-    challenge_users = db.query(ChallengeUser).filter(
-        ChallengeUser.CHALLENGE_MST_NO == challenge.CHALLENGE_MST_NO,
+    finalize_challenge_results(db, [challenge.CHALLENGE_MST_NO])
+
+
+# 챌린지 배치를 종료하고 최종 결과 확정 (커밋은 호출하는 쪽에서)
+def end_challenges_batch(db: Session, challenge_mst_nos: List[int]):
+    ended_nos = db.execute(
+        update(ChallengeMaster).where(
+            ChallengeMaster.CHALLENGE_MST_NO.in_(challenge_mst_nos),
+            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
+            ChallengeMaster.DELETE_YN == False
+        ).values(CHALLENGE_STATUS=ChallengeStatusType.COMPLETE)
+        .returning(ChallengeMaster.CHALLENGE_MST_NO)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    finalized = finalize_challenge_results(db, ended_nos)
+
+    return {"challenges": len(ended_nos), "users": finalized}
+
+
+# 참가자별 최종 진행도/순위/상태를 한 번에 계산해 challenge_user_stats에 확정
+def finalize_challenge_results(db: Session, challenge_mst_nos: List[int]):
+    if not challenge_mst_nos:
+        return 0
+
+    challenge_user_nos = [challenge_user_no for challenge_user_no, in db.query(ChallengeUser.CHALLENGE_USER_NO).filter(
+        ChallengeUser.CHALLENGE_MST_NO.in_(challenge_mst_nos),
         ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED
-    ).all()
+    ).all()]
 
+    # 원본 테이블 기준으로 최종 집계 후 순위/참가자 수 확정
+    rebuild_challenge_user_stats(db, challenge_user_nos)
+    db.flush()
 
-def get_challenge_user_list(db: Session, current_user: User, page: int):
-    page_size = 1
-    offset = (page - 1) * page_size
+    ranked = select(
+        ChallengeUserStats.CHALLENGE_USER_NO,
+        func.rank().over(partition_by=ChallengeUser.CHALLENGE_MST_NO,
+                         order_by=ChallengeUserStats.PROGRESS.desc()).label("RANK"),
+        func.count().over(partition_by=ChallengeUser.CHALLENGE_MST_NO).label("PARTICIPANT_COUNT")
+    ).join(
+        ChallengeUser, ChallengeUser.CHALLENGE_USER_NO == ChallengeUserStats.CHALLENGE_USER_NO
+    ).where(
+        ChallengeUser.CHALLENGE_MST_NO.in_(challenge_mst_nos),
+        ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED
+    ).subquery()
+
+    db.execute(
+        update(ChallengeUserStats).where(
+            ChallengeUserStats.CHALLENGE_USER_NO == ranked.c.CHALLENGE_USER_NO
+        ).values(
+            RANK=ranked.c.RANK,
+            PARTICIPANT_COUNT=ranked.c.PARTICIPANT_COUNT,
+            FINAL_DT=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+    )
 
-    # 총 항목 수 계산
-    total_items = db.query(ChallengeMaster). \
-        join(ChallengeUser, ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO). \
-        filter(ChallengeUser.USER_NO == current_user.USER_NO,
-               ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
-               ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED,
-               ChallengeMaster.DELETE_YN == False).count()
+    # 종료 시점의 상태를 상태별로 묶어서 저장 (상태 종류만큼의 UPDATE)
+    weekly_diary_counts = count_diaries_by_challenge_user_nos(
+        db, challenge_user_nos, datetime.utcnow() - timedelta(days=7))
+    users_by_status = {}
+    for challenge_user_no in challenge_user_nos:
+        user_status = get_user_status(weekly_diary_counts.get(challenge_user_no, 0))
+        users_by_status.setdefault(user_status, []).append(challenge_user_no)
+
+    for user_status, status_user_nos in users_by_status.items():
+        db.execute(
+            update(ChallengeUserStats).where(
+                ChallengeUserStats.CHALLENGE_USER_NO.in_(status_user_nos)
+            ).values(FINAL_STATUS=user_status.name).execution_options(synchronize_session=False)
+        )
 
-    # 총 페이지 수 계산
-    total_pages = ceil(total_items / page_size)
+    return len(challenge_user_nos)
 
-    challenge = db.query(ChallengeMaster). \
-        join(ChallengeUser, ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO). \
-        filter(ChallengeUser.USER_NO == current_user.USER_NO,
-               ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
-               ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED,
-               ChallengeMaster.DELETE_YN == False) \
-        .offset(offset) \
-        .limit(page_size) \
-        .first()
 
-    if not challenge:
+# 종료된 챌린지 참가자들의 확정된 결과 (CHALLENGE_USER_NO -> 진행도/순위/상태)
+# 결과가 확정되지 않은 이전 챌린지의 참가자는 원본 테이블로부터 진행도만 한 번에 계산
+def get_final_results(db: Session, challenge_user_nos: List[int]):
+    if not challenge_user_nos:
+        return {}
+
+    final_results = {
+        stats.CHALLENGE_USER_NO: {
+            "progress": stats.PROGRESS,
+            "RANK": stats.RANK,
+            "STATUS": UserStatus[stats.FINAL_STATUS] if stats.FINAL_STATUS else None
+        }
+        for stats in db.query(
+            ChallengeUserStats.CHALLENGE_USER_NO, ChallengeUserStats.PROGRESS, ChallengeUserStats.RANK,
+            ChallengeUserStats.FINAL_STATUS
+        ).filter(
+            ChallengeUserStats.CHALLENGE_USER_NO.in_(challenge_user_nos),
+            ChallengeUserStats.FINAL_DT.isnot(None)
+        ).all()
+    }
+
+    missing_nos = [challenge_user_no for challenge_user_no in challenge_user_nos
+                   if challenge_user_no not in final_results]
+    if missing_nos:
+        for challenge_user_no, progress in calculate_users_progress(db, challenge_user_nos=missing_nos).items():
+            final_results[challenge_user_no] = {"progress": progress, "RANK": None, "STATUS": None}
+
+    return final_results
+
+
+# 확인하지 않은 종료 챌린지 결과 목록
+# 챌린지/참가자 수와 무관하게 고정된 횟수의 쿼리로 조회 (챌린지, 참가자, 진행도)
+def get_challenge_log(db: Session, current_user: User):
+    completed_challenges = db.query(
+        ChallengeUser.CHALLENGE_USER_NO,
+        ChallengeMaster.CHALLENGE_MST_NO,
+        ChallengeMaster.CHALLENGE_MST_NM,
+        ChallengeMaster.START_DT,
+        ChallengeMaster.END_DT
+    ).join(
+        ChallengeMaster, ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO
+    ).filter(
+        ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.COMPLETE,
+        ChallengeUser.USER_NO == current_user.USER_NO,
+        ChallengeUser.IS_VIEW == False,
+    ).order_by(ChallengeMaster.CHALLENGE_MST_NO).all()
+
+    if not completed_challenges:
+        return []
+
+    participants = db.query(
+        ChallengeUser.CHALLENGE_MST_NO,
+        ChallengeUser.CHALLENGE_USER_NO,
+        User.USER_NM
+    ).join(
+        User, User.USER_NO == ChallengeUser.USER_NO
+    ).filter(
+        ChallengeUser.CHALLENGE_MST_NO.in_([challenge.CHALLENGE_MST_NO for challenge in completed_challenges])
+    ).order_by(ChallengeUser.CHALLENGE_USER_NO).all()
+
+    users_results = get_final_results(db, [participant.CHALLENGE_USER_NO for participant in participants])
+
+    participants_by_challenge = {}
+    for participant in participants:
+        result = users_results.get(participant.CHALLENGE_USER_NO, {})
+        participants_by_challenge.setdefault(participant.CHALLENGE_MST_NO, []).append(
+            {"USER_NM": participant.USER_NM,
+             "progress": result.get("progress", 0),
+             "RANK": result.get("RANK"),
+             "STATUS": result.get("STATUS")})
+
+    return [
+        {"CHALLENGE_MST_NM": challenge.CHALLENGE_MST_NM,
+         "CHALLENGE_MST_NO": challenge.CHALLENGE_MST_NO,
+         "CHALLENGE_USER_NO": challenge.CHALLENGE_USER_NO,
+         "START_DT": challenge.START_DT,
+         "END_DT": challenge.END_DT,
+         "participants": participants_by_challenge.get(challenge.CHALLENGE_MST_NO, [])}
+        for challenge in completed_challenges
+    ]
+
+
+# 챌린지 유저별 특정 시점 이후 일기 개수를 세는 쿼리 (동기/비동기 공용)
+def select_diary_counts(challenge_user_nos: List[int], since: datetime):
+    return select(
+        PersonDailyGoalComplete.CHALLENGE_USER_NO,
+        func.count(PersonDailyGoalComplete.DAILY_COMPLETE_NO)
+    ).where(
+        PersonDailyGoalComplete.CHALLENGE_USER_NO.in_(challenge_user_nos),
+        PersonDailyGoalComplete.INSERT_DT >= since
+    ).group_by(PersonDailyGoalComplete.CHALLENGE_USER_NO)
+
+
+# 챌린지 유저들의 특정 시점 이후 일기 개수를 한 번에 가져오기 (CHALLENGE_USER_NO -> 개수)
+def count_diaries_by_challenge_user_nos(db: Session, challenge_user_nos: List[int], since: datetime):
+    if not challenge_user_nos:
+        return {}
+
+    diary_counts = db.execute(select_diary_counts(challenge_user_nos, since)).all()
+
+    return {challenge_user_no: count for challenge_user_no, count in diary_counts}
+
+
+# 챌린지 유저들의 특정 시점 이후 일기 개수를 한 번에 가져오기 (비동기)
+async def count_diaries_by_challenge_user_nos_async(db: AsyncSession, challenge_user_nos: List[int],
+                                                    since: datetime):
+    if not challenge_user_nos:
+        return {}
+
+    result = await db.execute(select_diary_counts(challenge_user_nos, since))
+
+    return {challenge_user_no: count for challenge_user_no, count in result.all()}
+
+
+# 챌린지 유저들의 특정 시점 이후 일기를 한 번에 가져오기 (CHALLENGE_USER_NO -> 일기 리스트)
+async def get_diaries_by_challenge_user_nos(db: AsyncSession, challenge_user_nos: List[int], since: datetime):
+    if not challenge_user_nos:
         return {}
 
+    result = await db.execute(select(PersonDailyGoalComplete).where(
+        PersonDailyGoalComplete.CHALLENGE_USER_NO.in_(challenge_user_nos),
+        PersonDailyGoalComplete.INSERT_DT >= since
+    ))
+    diaries = result.scalars().all()
+
+    diaries_by_user = {}
+    for diary in diaries:
+        diaries_by_user.setdefault(diary.CHALLENGE_USER_NO, []).append(diary)
+
+    return diaries_by_user
+
+
+# 유저가 참여중인 진행중 챌린지 조건
+def get_progress_challenge_conditions(user_no: int):
+    return [
+        ChallengeUser.USER_NO == user_no,
+        ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
+        ChallengeUser.ACCEPT_STATUS == InviteAcceptType.ACCEPTED,
+        ChallengeMaster.DELETE_YN == False
+    ]
+
+
+# 여러 챌린지의 참가자 리스트를 한 번에 생성 (CHALLENGE_MST_NO -> ChallengeUserList 리스트)
+async def build_challenge_user_lists(db: AsyncSession, challenge_mst_nos: List[int], current_user: User):
     twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
 
     # ChallengeUserList 정보 조회
-    challenge_users = get_challenge_users_by_mst_no(db, challenge.CHALLENGE_MST_NO)
-
-    challenge_user_lists = []
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
+    result = await db.execute(select(ChallengeUser).where(
+        ChallengeUser.CHALLENGE_MST_NO.in_(challenge_mst_nos)
+    ).order_by(ChallengeUser.CHALLENGE_USER_NO))
+    challenge_users = result.scalars().all()
+    challenge_user_nos = [challenge_user.CHALLENGE_USER_NO for challenge_user in challenge_users]
+
+    # 참가자별 아바타, 일기, 진행도를 챌린지/참가자 수와 무관하게 고정된 횟수의 쿼리로 조회
+    equipped_avatars = await get_equipped_avatars(
+        db, list({challenge_user.USER_NO for challenge_user in challenge_users}))
+    recent_diaries = await get_diaries_by_challenge_user_nos(
+        db, [challenge_user.CHALLENGE_USER_NO for challenge_user in challenge_users
+             if challenge_user.USER_NO != current_user.USER_NO], twenty_four_hours_ago)
+    users_stats = await get_challenge_users_stats(db, challenge_user_nos)
+    # 최근 일주일 일기 수는 인덱스 범위 조회로 매번 정확하게 계산
+    weekly_diary_counts = await count_diaries_by_challenge_user_nos_async(
+        db, challenge_user_nos, datetime.utcnow() - timedelta(days=7))
+    image_variant_urls = await get_image_variant_urls_async(
+        db, [diary.IMAGE_FILE_NM for diaries in recent_diaries.values() for diary in diaries])
+
+    challenge_user_lists = {challenge_mst_no: [] for challenge_mst_no in challenge_mst_nos}
 
     for challenge_user in challenge_users:
-        # 각 사용자별로 Character 및 Pet 정보 조회
-        character = get_equipped_avatar(db, challenge_user.USER_NO, AvatarType.CHARACTER)
+        character_no = equipped_avatars.get((challenge_user.USER_NO, AvatarType.CHARACTER))
 
-        if not character:
+        if not character_no:
             raise HTTPException(status_code=404, detail="캐릭터 정보를 찾을 수 없습니다.")
 
-        pet = get_equipped_avatar(db, challenge_user.USER_NO, AvatarType.PET)
+        diaries = recent_diaries.get(challenge_user.CHALLENGE_USER_NO, [])
 
-        if challenge_user.USER_NO != current_user.USER_NO:
-            diaries = db.query(PersonDailyGoalComplete).filter(
-                PersonDailyGoalComplete.CHALLENGE_USER_NO == challenge_user.CHALLENGE_USER_NO,
-                PersonDailyGoalComplete.INSERT_DT >= twenty_four_hours_ago
-                # PersonDailyGoalComplete.COMMENT != '' or PersonDailyGoalComplete.IMAGE_FILE_NM != '',
-            ).all()
-        else:
-            diaries = []
+        stats = users_stats.get(challenge_user.CHALLENGE_USER_NO)
 
-        total_diaries = db.query(PersonDailyGoalComplete).filter(
-            PersonDailyGoalComplete.CHALLENGE_USER_NO == challenge_user.CHALLENGE_USER_NO,
-            PersonDailyGoalComplete.INSERT_DT >= one_week_ago
-        ).all()
-
-        diaries_length = len(total_diaries)
-        user_status = UserStatus.SLEEPING
-        if 1 <= diaries_length < 3:
-            user_status = UserStatus.WALKING  # '걷고 있음'
-        elif diaries_length >= 3:
-            user_status = UserStatus.RUNNING  # '뛰고 있음'
+        user_status = get_user_status(weekly_diary_counts.get(challenge_user.CHALLENGE_USER_NO, 0))
 
         challenge_user_list = ChallengeUserList(
             CHALLENGE_USER_NO=challenge_user.CHALLENGE_USER_NO,
-            PROGRESS=calculate_user_progress(db, challenge_user.CHALLENGE_USER_NO),
-            CHARACTER_NO=character.AVATAR_NO,
-            PET_NO=pet.AVATAR_NO if pet else None,
-            DIARIES=[DiaryPydantic.model_validate(diary) for diary in diaries],
+            PROGRESS=stats.PROGRESS if stats else 0,
+            CHARACTER_NO=character_no,
+            PET_NO=equipped_avatars.get((challenge_user.USER_NO, AvatarType.PET)),
+            DIARIES=[DiaryPydantic(DAILY_COMPLETE_NO=diary.DAILY_COMPLETE_NO,
+                                   IMAGE_VARIANTS=image_variant_urls.get(diary.IMAGE_FILE_NM))
+                     for diary in diaries],
             STATUS=user_status,
         )
-        challenge_user_lists.append(challenge_user_list)
+        challenge_user_lists[challenge_user.CHALLENGE_MST_NO].append(challenge_user_list)
+
+    return challenge_user_lists
+
+
+async def get_challenge_user_list(db: AsyncSession, current_user: User, page: int):
+    page_size = 1
+    offset = (page - 1) * page_size
+
+    # 총 항목 수는 같은 쿼리에서 윈도우 함수로 계산
+    result = await db.execute(
+        select(ChallengeMaster, func.count().over().label("TOTAL_COUNT"))
+        .join(ChallengeUser, ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO)
+        .where(*get_progress_challenge_conditions(current_user.USER_NO))
+        .order_by(ChallengeMaster.CHALLENGE_MST_NO)
+        .offset(offset)
+        .limit(page_size)
+    )
+    page_challenge = result.first()
+
+    if not page_challenge:
+        return {}
+
+    challenge, total_items = page_challenge
+
+    # 총 페이지 수 계산
+    total_pages = ceil(total_items / page_size)
+
+    challenge_user_lists = await build_challenge_user_lists(db, [challenge.CHALLENGE_MST_NO], current_user)
+
+    if not challenge_user_lists[challenge.CHALLENGE_MST_NO]:
+        raise HTTPException(status_code=404, detail="challenge_user를 찾을 수 없습니다.")
 
     return ChallengeUserListModel(
         CHALLENGE_MST_NO=challenge.CHALLENGE_MST_NO,
         CHALLENGE_MST_NM=challenge.CHALLENGE_MST_NM,
-        challenge_user=challenge_user_lists,
+        challenge_user=challenge_user_lists[challenge.CHALLENGE_MST_NO],
         total_page=total_pages)
 
 
+# 유저의 진행중인 챌린지들과 참가자 리스트를 한 번에 조회 (CHALLENGE_MST_NO 기준 keyset 페이지네이션)
+async def get_challenge_feed(db: AsyncSession, current_user: User, cursor: int = None, limit: int = 3):
+    progress_conditions = get_progress_challenge_conditions(current_user.USER_NO)
+
+    # 전체 개수는 페이지와 무관하게 별도로 계산 (마지막 페이지 이후 요청에도 유지)
+    total_count = (await db.execute(select(func.count(ChallengeMaster.CHALLENGE_MST_NO)).join(
+        ChallengeUser, ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO
+    ).where(*progress_conditions))).scalar()
+
+    query = select(ChallengeMaster.CHALLENGE_MST_NO, ChallengeMaster.CHALLENGE_MST_NM).join(
+        ChallengeUser, ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO
+    ).where(*progress_conditions)
+    if cursor is not None:
+        query = query.where(ChallengeMaster.CHALLENGE_MST_NO > cursor)
+
+    # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+    result = await db.execute(query.order_by(ChallengeMaster.CHALLENGE_MST_NO).limit(limit + 1))
+    challenges = result.all()
+    has_next = len(challenges) > limit
+    challenges = challenges[:limit]
+
+    challenge_user_lists = await build_challenge_user_lists(
+        db, [challenge.CHALLENGE_MST_NO for challenge in challenges], current_user)
+
+    return ChallengeFeed(
+        challenges=[ChallengeUserListModel(
+            CHALLENGE_MST_NO=challenge.CHALLENGE_MST_NO,
+            CHALLENGE_MST_NM=challenge.CHALLENGE_MST_NM,
+            challenge_user=challenge_user_lists[challenge.CHALLENGE_MST_NO]
+        ) for challenge in challenges],
+        total_count=total_count,
+        next_cursor=challenges[-1].CHALLENGE_MST_NO if has_next else None
+    )
+
+
 def get_challenge_user_detail(db: Session, challenge_user_no: int, current_user: User):
     target_user = get_challenge_user_by_challenge_user_no(db, challenge_user_no)
     used_user = get_challenge_user_by_user_no(db, target_user.CHALLENGE_MST_NO, current_user.USER_NO)
 
     character = get_equipped_avatar(db, target_user.USER_NO, AvatarType.CHARACTER)
 
-    items = db.query(Item).all()
+    items = catalog.get_items()
     item_list = []
 
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
-
-    diaries = db.query(PersonDailyGoalComplete).filter(
-        PersonDailyGoalComplete.CHALLENGE_USER_NO == target_user.CHALLENGE_USER_NO,
-        PersonDailyGoalComplete.INSERT_DT >= one_week_ago
-    ).all()
-
-    diary_count = len(diaries)
+    diary_count = count_diaries_by_challenge_user_nos(
+        db, [target_user.CHALLENGE_USER_NO], datetime.utcnow() - timedelta(days=7)
+    ).get(target_user.CHALLENGE_USER_NO, 0)
     user_status = UserStatus.SLEEPING
     if diary_count == 1:
         user_status = UserStatus.WALKING  # '걷고 있음'
@@ -630,8 +1055,8 @@ def get_challenge_user_detail(db: Session, challenge_user_no: int, current_user:
 
 
 def get_challenge_history_list(db: Session, current_day: datetime, _current_user: User, page: int):
-    challenge = get_active_challenges_for_user(db, _current_user.USER_NO, current_day, page)
-    if not challenge:
+    user_challenge = get_active_challenges_for_user(db, _current_user.USER_NO, current_day, page)
+    if not user_challenge:
         return GetChallengeHistory(
             CHALLENGE_MST_NO=0,
             CHALLENGE_MST_NM=None,
@@ -642,16 +1067,7 @@ def get_challenge_history_list(db: Session, current_day: datetime, _current_user
             total_size=0
         )
 
-    total_size = db.query(ChallengeMaster).join(
-        ChallengeUser,
-        ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO
-    ).filter(
-        ChallengeUser.USER_NO == _current_user.USER_NO,
-        ChallengeMaster.START_DT <= current_day,
-        ChallengeMaster.END_DT >= current_day,
-        ChallengeMaster.DELETE_YN == False,
-        ChallengeMaster.CHALLENGE_STATUS != ChallengeStatusType.PENDING
-    ).count()
+    challenge, total_size = user_challenge
 
     challenge_user = get_challenge_user_by_user_no(db, challenge.CHALLENGE_MST_NO, _current_user.USER_NO)
 
@@ -663,11 +1079,13 @@ def get_challenge_history_list(db: Session, current_day: datetime, _current_user
 
     daily_complete_users_list = []
     image_file = ''
+    image_variants = None
     comment = ''
     person_goal = []
 
     if daily_complete:
         image_file = daily_complete.IMAGE_FILE_NM
+        image_variants = get_image_variant_urls(db, [image_file]).get(image_file)
         comment = daily_complete.COMMENT
         daily_complete_users = db.query(DailyCompleteUser).filter(
             DailyCompleteUser.DAILY_COMPLETE_NO == daily_complete.DAILY_COMPLETE_NO,
@@ -688,6 +1106,7 @@ def get_challenge_history_list(db: Session, current_day: datetime, _current_user
         CHALLENGE_MST_NO=challenge.CHALLENGE_MST_NO,
         CHALLENGE_MST_NM=challenge.CHALLENGE_MST_NM,
         IMAGE_FILE_NM=image_file,
+        IMAGE_VARIANTS=image_variants,
         EMOJI=daily_complete_users_list,
         COMMENT=comment,
         personGoal=person_goal,
@@ -728,12 +1147,19 @@ def challenge_update(db: Session, challenge_mst_no: int, _challenge_update: Chal
         if challenge_user.USER.UID not in update_user_ids:
             db.delete(challenge_user)
 
+    dates_changed = (challenge.START_DT, challenge.END_DT) != (_challenge_update.START_DT, _challenge_update.END_DT)
+
     # 챌린지 정보 업데이트
     challenge.CHALLENGE_MST_NM = _challenge_update.CHALLENGE_MST_NM
     challenge.START_DT = _challenge_update.START_DT
     challenge.END_DT = _challenge_update.END_DT
     challenge.HEADER_EMOJI = _challenge_update.HEADER_EMOJI
 
+    # 기간이 바뀌면 저장된 진행도를 다시 계산
+    if dates_changed:
+        rebuild_challenge_user_stats(db, challenge_mst_nos=[challenge_mst_no])
+    notify_challenge_timer(db, challenge_mst_no)
+
     db.commit()
 
     return {"message": "챌린지가 성공적으로 업데이트 되었습니다."}
@@ -1,19 +1,20 @@
 import random
 from datetime import date, datetime
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.params import Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, get_async_db
 from domain.challenge import challenge_schema, challenge_crud
 from domain.challenge.challenge_crud import get_challenge_list, get_challenge_detail, \
-    get_challenge_invite, get_challenge_user_by_user_no, start_challenge, calculate_user_progress, \
-    get_challenge_participants, get_challenge_master_by_id
+    get_challenge_invite, get_challenge_user_by_user_no, start_challenge, get_challenge_master_by_id
 from domain.challenge.challenge_schema import ChallengeInvite, PutChallengeInvite
-from domain.desc.utils import get_random_avatar_not_owned_by_user, RewardType, select_randomly_with_probability
-from domain.user.user_crud import get_current_user
-from models import User, ChallengeUser, ChallengeMaster, ChallengeStatusType, AvatarUser, InviteAcceptType
+from domain.desc.utils import grant_random_avatar, RewardType, select_randomly_with_probability
+from domain.user.user_crud import get_current_user, get_current_user_async
+from models import User, ChallengeUser, ChallengeMaster, ChallengeStatusType, InviteAcceptType, ChallengeUserStats
 
 router = APIRouter(
     prefix="/challenge",
@@ -130,15 +131,26 @@ def challenge_delete(challenge_mst_no: int, db: Session = Depends(get_db),
 
 
 @router.get("/user/list", response_model=challenge_schema.ChallengeUserListModel)
-def get_challenge_user_list(db: Session = Depends(get_db), current_user: User = Depends(get_current_user),
-                            page: int = Query(1, description="페이지 번호")):
+async def get_challenge_user_list(db: AsyncSession = Depends(get_async_db),
+                                  current_user: User = Depends(get_current_user_async),
+                                  page: int = Query(1, description="페이지 번호")):
     if page < 1:
         raise HTTPException(status_code=404, detail="페이지 숫자는 0보다 커야합니다.")
-    challenge_user_list_data = challenge_crud.get_challenge_user_list(db, current_user, page)
+    challenge_user_list_data = await challenge_crud.get_challenge_user_list(db, current_user, page)
 
     return challenge_user_list_data
 
 
+@router.get("/user/feed", response_model=challenge_schema.ChallengeFeed)
+async def get_challenge_feed(db: AsyncSession = Depends(get_async_db),
+                             current_user: User = Depends(get_current_user_async),
+                             cursor: Optional[int] = Query(None, description="이전 응답의 next_cursor"),
+                             limit: int = Query(3, ge=1, le=20, description="한 번에 가져올 챌린지 수")):
+    challenge_feed = await challenge_crud.get_challenge_feed(db, current_user, cursor, limit)
+
+    return challenge_feed
+
+
 @router.get("/user/{challenge_user_no}", response_model=challenge_schema.GetChallengeUserDetail)
 def get_challenge_user_detail(challenge_user_no: int, db: Session = Depends(get_db),
                               current_user: User = Depends(get_current_user)):
@@ -203,34 +215,8 @@ def get_challenge_history_list(current_day: datetime, page: int = Query(1, descr
 
 @router.get("/log")
 def get_challenge_log(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    completed_challenge_users = db.query(ChallengeUser).join(
-        ChallengeMaster, ChallengeUser.CHALLENGE_MST_NO == ChallengeMaster.CHALLENGE_MST_NO
-    ).filter(
-        ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.COMPLETE,
-        ChallengeUser.USER_NO == current_user.USER_NO,
-        ChallengeUser.IS_VIEW == False,
-    ).all()
-
-    completed_challenges_data = []
-
-    for completed_challenge_user in completed_challenge_users:
-        challenge_users = get_challenge_participants(db, completed_challenge_user.CHALLENGE_MST.CHALLENGE_MST_NO)
-        challenge_users_data = []
-        challenge = completed_challenge_user.CHALLENGE_MST
-
-        for challenge_user in challenge_users:
-            challenge_users_data.append({"USER_NM": challenge_user.User.USER_NM,
-                                         "progress": calculate_user_progress(db,
-                                                                             completed_challenge_user.CHALLENGE_USER_NO)})
-
-        completed_challenges_data.append(
-            {"CHALLENGE_MST_NM": completed_challenge_user.CHALLENGE_MST.CHALLENGE_MST_NM,
-             "CHALLENGE_MST_NO": challenge.CHALLENGE_MST_NO,
-             "CHALLENGE_USER_NO": completed_challenge_user.CHALLENGE_USER_NO,
-             "START_DT": challenge.START_DT,
-             "END_DT": challenge.END_DT,
-             "participants": challenge_users_data})
-    db.commit()
+    completed_challenges_data = challenge_crud.get_challenge_log(db, current_user)
+
     return completed_challenges_data
 
 
@@ -246,8 +232,17 @@ def update_challenge_log(challenge_user_no: int, db: Session = Depends(get_db),
 
     duration = (challenge_user.CHALLENGE_MST.END_DT - challenge_user.CHALLENGE_MST.START_DT).days
 
-    challenge_user_count = db.query(ChallengeUser).filter(
-        ChallengeUser.CHALLENGE_MST_NO == challenge_user.CHALLENGE_MST_NO).count()
+    # 종료 시 확정된 참가자 수 사용 (확정 전 챌린지는 직접 집계)
+    final_stats = db.query(ChallengeUserStats).filter(
+        ChallengeUserStats.CHALLENGE_USER_NO == challenge_user.CHALLENGE_USER_NO,
+        ChallengeUserStats.FINAL_DT.isnot(None)
+    ).first()
+
+    if final_stats:
+        challenge_user_count = final_stats.PARTICIPANT_COUNT
+    else:
+        challenge_user_count = db.query(ChallengeUser).filter(
+            ChallengeUser.CHALLENGE_MST_NO == challenge_user.CHALLENGE_MST_NO).count()
 
     avatar_type = select_randomly_with_probability(50 + challenge_user_count * 5, 0, 50 - challenge_user_count * 5,
                                                    duration)
@@ -255,12 +250,9 @@ def update_challenge_log(challenge_user_no: int, db: Session = Depends(get_db),
     avatar = None
 
     if avatar_type == RewardType.AVATAR:
-        avatar = get_random_avatar_not_owned_by_user(db, current_user.USER_NO)
+        avatar = grant_random_avatar(db, current_user.USER_NO)
 
-        if avatar:
-            db_avatar_user = AvatarUser(AVATAR_NO=avatar.AVATAR_NO, USER_NO=current_user.USER_NO, IS_EQUIP=False)
-            db.add(db_avatar_user)
-        else:
+        if not avatar:
             avatar_type = RewardType.NOTHING
 
     db.commit()
@@ -0,0 +1,385 @@
+import logging
+import selectors
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List
+
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.schedulers.background import BackgroundScheduler
+from pytz import timezone, utc
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from starlette.config import Config
+
+from database import SessionLocal, engine
+from domain.challenge.challenge_crud import start_challenges_batch, end_challenges_batch, end_challenge_server, \
+    rebuild_challenge_user_stats, CHALLENGE_TIMER_CHANNEL
+from domain.user.friend_crud import rebuild_friend_suggestions
+from models import ChallengeMaster, ChallengeStatusType, SchedulerCheckpoint, JobStatusType
+
+config = Config('.env')
+SCHEDULER_CHUNK_SIZE = config('SCHEDULER_CHUNK_SIZE', cast=int, default=500)
+SCHEDULER_LOCK_KEY = config('SCHEDULER_LOCK_KEY', cast=int, default=4040)  # 클러스터 전체에서 공유하는 advisory lock 키
+SCHEDULER_TIMEZONE = timezone('Asia/Seoul')
+
+logger = logging.getLogger(__name__)
+
+# 스케줄러 작업의 마지막 실행 결과 (내부 API에서 조회)
+scheduler_metrics = {}
+
+
+# 작업별 체크포인트 조회 (없으면 생성)
+def get_checkpoint(db: Session, job_nm: str):
+    checkpoint = db.query(SchedulerCheckpoint).filter(SchedulerCheckpoint.JOB_NM == job_nm).first()
+    if not checkpoint:
+        checkpoint = SchedulerCheckpoint(JOB_NM=job_nm, LAST_KEY=0, PROCESSED_COUNT=0)
+        db.add(checkpoint)
+    return checkpoint
+
+
+# 조건에 맞는 챌린지를 CHALLENGE_MST_NO 순서로 청크 단위 처리 (청크마다 처리 결과와 체크포인트를 함께 커밋)
+# 조건이 상태 기반이고 각 단계가 멱등이므로 매 실행마다 처음부터 처리 (LAST_KEY는 진행 상황 확인용)
+def run_chunked_job(db: Session, job_nm: str, filters: List, process_chunk, chunk_size: int = SCHEDULER_CHUNK_SIZE):
+    started_at = time.monotonic()
+    checkpoint = get_checkpoint(db, job_nm)
+
+    metrics = {"chunks": 0, "processed": 0, "rows": {}, "failures": 0, "failed_keys": [], "error": None}
+
+    checkpoint.STATUS = JobStatusType.RUNNING
+    checkpoint.LAST_KEY = 0
+    checkpoint.PROCESSED_COUNT = 0
+    checkpoint.ERROR_MSG = None
+    checkpoint.START_DT = datetime.utcnow()
+    checkpoint.END_DT = None
+    db.commit()
+
+    last_key = 0
+    while True:
+        challenge_mst_nos = [challenge_mst_no for challenge_mst_no, in db.query(ChallengeMaster.CHALLENGE_MST_NO).filter(
+            *filters,
+            ChallengeMaster.CHALLENGE_MST_NO > last_key
+        ).order_by(ChallengeMaster.CHALLENGE_MST_NO).limit(chunk_size).all()]
+
+        if not challenge_mst_nos:
+            break
+
+        try:
+            rows = process_chunk(db, challenge_mst_nos)
+            processed_nos = challenge_mst_nos
+        except Exception:
+            db.rollback()
+            logger.exception("스케줄러 작업 청크 실패, 한 건씩 다시 처리: %s (%d ~ %d)",
+                             job_nm, challenge_mst_nos[0], challenge_mst_nos[-1])
+            rows, processed_nos = process_one_by_one(db, job_nm, challenge_mst_nos, process_chunk, metrics)
+
+        last_key = challenge_mst_nos[-1]
+        checkpoint.LAST_KEY = last_key
+        checkpoint.PROCESSED_COUNT += len(processed_nos)
+        db.commit()
+
+        metrics["chunks"] += 1
+        metrics["processed"] += len(processed_nos)
+        for key, value in (rows or {}).items():
+            metrics["rows"][key] = metrics["rows"].get(key, 0) + value
+
+        logger.info("스케줄러 작업 진행: %s %d건 처리 (마지막 위치 %d)", job_nm, metrics["processed"], last_key)
+
+    # 실패한 챌린지는 건너뛰고 끝까지 처리한 뒤 결과만 FAILED로 남김 (다음 실행에서 다시 시도됨)
+    checkpoint.STATUS = JobStatusType.FAILED if metrics["failures"] else JobStatusType.COMPLETE
+    checkpoint.ERROR_MSG = metrics["error"]
+    checkpoint.END_DT = datetime.utcnow()
+    db.commit()
+
+    metrics["elapsed"] = round(time.monotonic() - started_at, 3)
+    return metrics
+
+
+# 실패한 청크를 챌린지 한 건씩 처리하고, 계속 실패하는 챌린지는 기록 후 건너뜀
+def process_one_by_one(db: Session, job_nm: str, challenge_mst_nos: List[int], process_chunk, metrics):
+    rows = {}
+    processed_nos = []
+
+    for challenge_mst_no in challenge_mst_nos:
+        try:
+            for key, value in (process_chunk(db, [challenge_mst_no]) or {}).items():
+                rows[key] = rows.get(key, 0) + value
+            db.commit()
+            processed_nos.append(challenge_mst_no)
+        except Exception as e:
+            db.rollback()
+            logger.exception("스케줄러 작업 실패, 건너뜀: %s (CHALLENGE_MST_NO %d)", job_nm, challenge_mst_no)
+
+            metrics["failures"] += 1
+            metrics["failed_keys"].append(challenge_mst_no)
+            metrics["error"] = str(e)
+
+    return rows, processed_nos
+
+
+# PostgreSQL advisory lock으로 리더 선출 (워커/서버가 여러 개여도 한 곳에서만 실행)
+# 세션 단위 잠금이므로 작업 세션과 분리된 전용 커넥션에서 잡고 해제
+@contextmanager
+def leader_lock(lock_key: int = SCHEDULER_LOCK_KEY):
+    with engine.connect() as connection:
+        acquired = connection.execute(select(func.pg_try_advisory_lock(lock_key))).scalar()
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(select(func.pg_advisory_unlock(lock_key)))
+                connection.commit()
+
+
+def check_and_start_challenges():
+    with leader_lock() as is_leader:
+        if not is_leader:
+            logger.info("다른 인스턴스에서 스케줄러 작업이 실행 중이므로 건너뜀")
+            return
+
+        run_challenge_sweep()
+
+
+# 챌린지 청크에 속한 모든 참가자의 통계 재계산
+def rebuild_challenge_stats_chunk(db: Session, challenge_mst_nos: List[int]):
+    return {"users": rebuild_challenge_user_stats(db, challenge_mst_nos=challenge_mst_nos)}
+
+
+def run_challenge_sweep():
+    db = SessionLocal()  # 직접 세션 생성
+    try:
+        current_date = datetime.utcnow()
+        run_metrics = {"started_at": current_date.isoformat()}
+
+        run_metrics["start"] = run_chunked_job(db, "challenge_start", [
+            ChallengeMaster.START_DT <= current_date,
+            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PENDING,
+            ChallengeMaster.DELETE_YN == False,
+        ], start_challenges_batch)
+
+        run_metrics["end"] = run_chunked_job(db, "challenge_end", [
+            ChallengeMaster.END_DT <= current_date,
+            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
+            ChallengeMaster.DELETE_YN == False,
+        ], end_challenges_batch)
+
+        # 진행중인 챌린지 유저 통계 재계산 (누락되거나 어긋난 진행도 복구)
+        run_metrics["stats"] = run_chunked_job(db, "challenge_stats", [
+            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
+            ChallengeMaster.DELETE_YN == False,
+        ], rebuild_challenge_stats_chunk)
+
+        scheduler_metrics["last_run"] = run_metrics
+    finally:
+        db.close()  # 세션 닫기
+
+
+# 전체 유저의 친구 추천 목록 재계산 (친구 수락 시에는 관련 유저만 즉시 갱신됨)
+def refresh_friend_suggestions_job():
+    with leader_lock(SCHEDULER_LOCK_KEY + 1) as is_leader:
+        if not is_leader:
+            return
+
+        started_at = time.monotonic()
+        db = SessionLocal()
+        try:
+            suggestion_count = rebuild_friend_suggestions(db)
+        finally:
+            db.close()
+
+        scheduler_metrics["friend_suggestions"] = {
+            "suggestions": suggestion_count,
+            "elapsed": round(time.monotonic() - started_at, 3)
+        }
+
+
+# START_DT 시각에 실행되는 챌린지 시작 타이머
+def start_challenge_on_time(challenge_mst_no: int):
+    db = SessionLocal()
+    try:
+        # 타이머 등록 이후 일정이 늦춰졌으면 시작하지 않음 (변경 알림으로 다시 등록됨)
+        is_due = db.query(ChallengeMaster.CHALLENGE_MST_NO).filter(
+            ChallengeMaster.CHALLENGE_MST_NO == challenge_mst_no,
+            ChallengeMaster.START_DT <= datetime.utcnow()
+        ).first()
+        if not is_due:
+            return
+
+        start_challenges_batch(db, [challenge_mst_no])
+        db.commit()
+    finally:
+        db.close()
+
+
+# END_DT 시각에 실행되는 챌린지 종료 타이머
+def end_challenge_on_time(challenge_mst_no: int):
+    db = SessionLocal()
+    try:
+        # 여러 프로세스에서 동시에 실행되어도 한 번만 종료되도록 행 잠금 후 상태 확인
+        challenge = db.query(ChallengeMaster).filter(
+            ChallengeMaster.CHALLENGE_MST_NO == challenge_mst_no,
+            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
+            ChallengeMaster.DELETE_YN == False,
+            ChallengeMaster.END_DT <= datetime.utcnow()
+        ).with_for_update().first()
+        if not challenge:
+            return
+
+        end_challenge_server(db, challenge)
+        db.commit()
+    finally:
+        db.close()
+
+
+# 챌린지별 START_DT / END_DT 정각에 실행되는 타이머 관리
+# 부팅 시 DB에서 다시 만들고, 일정 변경은 PostgreSQL NOTIFY로 전달받아 갱신
+class ChallengeTimers:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self._listener = None
+        self._stopped = threading.Event()
+
+    def schedule(self, challenge_mst_no: int, status: ChallengeStatusType, start_dt: datetime, end_dt: datetime,
+                 delete_yn: bool):
+        for prefix in ("challenge_start", "challenge_end"):
+            job = self.scheduler.get_job(f"{prefix}:{challenge_mst_no}")
+            if job:
+                job.remove()
+
+        if delete_yn or status not in (ChallengeStatusType.PENDING, ChallengeStatusType.PROGRESS):
+            return
+
+        # START_DT / END_DT는 UTC 기준으로 저장됨, 이미 지난 시각이면 바로 실행
+        if status == ChallengeStatusType.PENDING and start_dt:
+            self.scheduler.add_job(start_challenge_on_time, 'date', run_date=utc.localize(start_dt),
+                                   args=[challenge_mst_no], id=f"challenge_start:{challenge_mst_no}",
+                                   misfire_grace_time=None)
+        if end_dt:
+            self.scheduler.add_job(end_challenge_on_time, 'date', run_date=utc.localize(end_dt),
+                                   args=[challenge_mst_no], id=f"challenge_end:{challenge_mst_no}",
+                                   misfire_grace_time=None)
+
+    # 챌린지 하나의 타이머를 DB 기준으로 다시 등록
+    def refresh(self, challenge_mst_no: int):
+        db = SessionLocal()
+        try:
+            challenge = db.query(
+                ChallengeMaster.CHALLENGE_STATUS, ChallengeMaster.START_DT, ChallengeMaster.END_DT,
+                ChallengeMaster.DELETE_YN
+            ).filter(ChallengeMaster.CHALLENGE_MST_NO == challenge_mst_no).first()
+        finally:
+            db.close()
+
+        if challenge:
+            self.schedule(challenge_mst_no, *challenge)
+        else:
+            self.schedule(challenge_mst_no, None, None, None, True)
+
+    # 대기중/진행중인 챌린지의 타이머를 모두 등록 (CHALLENGE_STATUS 인덱스 사용)
+    def load(self):
+        db = SessionLocal()
+        try:
+            challenges = db.query(
+                ChallengeMaster.CHALLENGE_MST_NO, ChallengeMaster.CHALLENGE_STATUS, ChallengeMaster.START_DT,
+                ChallengeMaster.END_DT, ChallengeMaster.DELETE_YN
+            ).filter(
+                ChallengeMaster.CHALLENGE_STATUS.in_([ChallengeStatusType.PENDING, ChallengeStatusType.PROGRESS]),
+                ChallengeMaster.DELETE_YN == False
+            ).all()
+        finally:
+            db.close()
+
+        for challenge in challenges:
+            self.schedule(*challenge)
+
+        logger.info("챌린지 타이머 %d건 등록", len(challenges))
+        return len(challenges)
+
+    def start_listener(self):
+        self._listener = threading.Thread(target=self._listen, name="challenge-timer-listener", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self):
+        self._stopped.set()
+
+    # 일정 변경 알림 수신 (연결이 끊기면 재연결 후 전체 타이머를 다시 불러와 누락된 알림을 보완)
+    def _listen(self):
+        reconnected = False
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                driver_connection = connection.driver_connection
+                driver_connection.autocommit = True
+                driver_connection.cursor().execute(f"LISTEN {CHALLENGE_TIMER_CHANNEL}")
+
+                if reconnected:
+                    self.load()
+                reconnected = True
+
+                with selectors.DefaultSelector() as selector:
+                    selector.register(driver_connection, selectors.EVENT_READ)
+                    while not self._stopped.is_set():
+                        if not selector.select(timeout=5):
+                            continue
+
+                        driver_connection.poll()
+                        while driver_connection.notifies:
+                            notify = driver_connection.notifies.pop(0)
+                            self.refresh(int(notify.payload))
+            except Exception:
+                logger.exception("챌린지 타이머 알림 수신 실패, 재연결 시도")
+                self._stopped.wait(5)
+            finally:
+                if connection is not None:
+                    connection.invalidate()
+
+
+# 작업 지연 시간 기록 (예정 시각 대비 완료 시각)
+# 챌린지별 타이머는 종류(challenge_start / challenge_end)별로 묶어서 기록
+def record_job_event(event):
+    job_key = event.job_id.split(":")[0]
+    job_metrics = scheduler_metrics.setdefault("jobs", {}).setdefault(job_key, {})
+    job_metrics["scheduled_run_time"] = event.scheduled_run_time.isoformat()
+
+    if event.code == EVENT_JOB_MISSED:
+        job_metrics["status"] = "MISSED"
+        logger.warning("스케줄러 작업 누락: %s (예정 %s)", event.job_id, event.scheduled_run_time)
+        return
+
+    latency = (datetime.now(SCHEDULER_TIMEZONE) - event.scheduled_run_time).total_seconds()
+    job_metrics["status"] = "FAILED" if event.exception else "COMPLETE"
+    job_metrics["latency"] = round(latency, 3)
+    logger.info("스케줄러 작업 완료: %s (예정 시각 대비 %.3fs)", event.job_id, latency)
+
+
+# 챌린지 스케줄러 생성
+# 챌린지별 타이머가 정각에 시작/종료하고, 매일 04:00 (Asia/Seoul) 정기 작업은 누락분 보완 및 통계 갱신
+def create_scheduler(scheduler_class=BackgroundScheduler):
+    scheduler = scheduler_class()
+    scheduler.configure(timezone=SCHEDULER_TIMEZONE)
+
+    # 재시작 등으로 실행 시각을 놓쳐도 1시간 안이면 한 번만 실행
+    scheduler.add_job(check_and_start_challenges, 'cron', hour=4, minute=00, id="challenge_sweep",
+                      coalesce=True, misfire_grace_time=3600)
+    scheduler.add_job(refresh_friend_suggestions_job, 'cron', hour=4, minute=30, id="friend_suggestions",
+                      coalesce=True, misfire_grace_time=3600)
+    scheduler.add_listener(record_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+
+    scheduler.challenge_timers = ChallengeTimers(scheduler)
+    return scheduler
+
+
+# 챌린지 타이머를 불러오고 스케줄러 시작 (BlockingScheduler는 여기서 블로킹됨)
+def start_scheduler(scheduler):
+    scheduler.challenge_timers.load()
+    scheduler.challenge_timers.start_listener()
+    scheduler.start()
+
+
+def shutdown_scheduler(scheduler):
+    scheduler.challenge_timers.stop_listener()
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
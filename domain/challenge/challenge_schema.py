@@ -1,7 +1,7 @@
 from datetime import datetime, date
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Dict
 
 from models import ChallengeStatusType, InviteAcceptType, ItemType
 from enum import Enum
@@ -21,6 +21,7 @@ class ChallengeParticipant(BaseModel):
 
 class DiaryPydantic(BaseModel):
     DAILY_COMPLETE_NO: int
+    IMAGE_VARIANTS: Optional[Dict[str, str]] = None
 
     class Config:
         from_attributes = True
@@ -52,6 +53,12 @@ class ChallengeUserListModel(BaseModel):
     total_page: Optional[int] = Field(0)
 
 
+class ChallengeFeed(BaseModel):
+    challenges: List[ChallengeUserListModel]
+    total_count: int
+    next_cursor: Optional[int] = None
+
+
 class ChallengeMST(BaseModel):
     CHALLENGE_MST_NO: int
     CHALLENGE_MST_NM: str
@@ -165,6 +172,7 @@ class GetChallengeHistory(BaseModel):
     CHALLENGE_MST_NO: Optional[int]
     CHALLENGE_MST_NM: Optional[str]
     IMAGE_FILE_NM: Optional[str]
+    IMAGE_VARIANTS: Optional[Dict[str, str]] = None
     EMOJI: Optional[List[EmojiUser]]
     COMMENT: Optional[str]
     personGoal: Optional[List[PersonDailyGoalPydantic]]
@@ -5,6 +5,7 @@ from starlette import status
 from database import get_db
 from domain.challenge.challenge_crud import get_challenge_master_by_id, get_challenge_user_by_challenge_user_no
 from domain.challenge.daily import daily_schema, daily_crud
+from domain.desc.utils import verify_uploaded_image
 from domain.user.user_router import get_current_user
 from models import User
 
@@ -68,4 +69,7 @@ def complete_daily(_complete_daily: daily_schema.CompleteDailyGoalAll,
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="완료 권한이 없습니다.")
 
+    if _complete_daily.IMAGE_FILE_NM:
+        verify_uploaded_image(_complete_daily.IMAGE_FILE_NM, _current_user.UID)
+
     daily_crud.complete_daily_goal(db, complete_daily=_complete_daily)
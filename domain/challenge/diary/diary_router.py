@@ -11,7 +11,7 @@ from domain.challenge.challenge_crud import get_challenge_user_by_challenge_user
 from domain.challenge.diary import diary_crud
 from domain.challenge.diary.diary_schema import CreateDiary
 from domain.desc.utils import select_randomly_with_probability, RewardType, get_random_item, \
-    get_random_avatar_not_owned_by_user
+    get_random_avatar_not_owned_by_user, get_image_variant_urls, verify_uploaded_image
 from domain.user.user_crud import get_current_user
 from models import User, DailyCompleteUser, PersonDailyGoalComplete, ChallengeUser, ItemUser, AvatarUser, Avatar, \
     PersonDailyGoal
@@ -54,7 +54,10 @@ def get_diary(daily_complete_no: int, db: Session = Depends(get_db)):
         "IS_DONE": goal.IS_DONE
     } for goal in person_goals]
 
-    return {"diary": diary, "user": challenge_user.USER.USER_NM, "goals": goals_data}
+    image_variants = get_image_variant_urls(db, [diary.IMAGE_FILE_NM]).get(diary.IMAGE_FILE_NM)
+
+    return {"diary": diary, "user": challenge_user.USER.USER_NM, "goals": goals_data,
+            "IMAGE_VARIANTS": image_variants}
 
 
 @router.post("")
@@ -80,12 +83,17 @@ def create_diary(_create_diary: CreateDiary, db: Session = Depends(get_db),
     if existing_diary:
         raise HTTPException(status_code=400, detail="오늘 이미 일기가 작성되었습니다.")
 
+    # 직접 업로드한 이미지가 실제로 존재하는지 확인한 뒤 저장
+    if _create_diary.IMAGE_FILE_NM:
+        verify_uploaded_image(_create_diary.IMAGE_FILE_NM, current_user.UID)
+
     db_diary = PersonDailyGoalComplete(
         IMAGE_FILE_NM=_create_diary.IMAGE_FILE_NM,
         COMMENT=_create_diary.COMMENT,
         CHALLENGE_USER=challenge_user
     )
     db.add(db_diary)
+    challenge_crud.update_challenge_user_stats(db, challenge_user, diary_delta=1)
 
     db.commit()
 
@@ -1,24 +1,23 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi import HTTPException
-from sqlalchemy import func
+from sqlalchemy import func, and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from domain.challenge import challenge_crud
 from domain.challenge.challenge_crud import get_challenge_user_by_user_no
-from domain.desc.utils import select_randomly_with_probability, RewardType, get_random_item, \
-    get_random_avatar_not_owned_by_user
-from models import ItemUser, ItemLog, AdditionalGoal, PersonDailyGoal, AvatarType, User, AvatarUser
+from domain.desc.utils import select_randomly_with_probability, RewardType, get_random_item, grant_random_avatar
+from models import ItemUser, ItemLog, AdditionalGoal, PersonDailyGoal, AvatarType, User, ChallengeUser, AvatarUser, \
+    Avatar
 
 
 def get_item(db: Session, current_user: User, challenge_user_no):
     select_item_type = select_randomly_with_probability(5, 95, 0, 0)
 
     if select_item_type == RewardType.AVATAR:
-        avatar = get_random_avatar_not_owned_by_user(db, current_user.USER_NO)
+        avatar = grant_random_avatar(db, current_user.USER_NO)
         if avatar:
             select_item = avatar.AVATAR_NO
-            db_avatar_user = AvatarUser(AVATAR_NO=avatar.AVATAR_NO, USER_NO=current_user.USER_NO, IS_EQUIP=False)
-            db.add(db_avatar_user)
             db.commit()
             return {"message": "아이템 추가 완료", "item_type": select_item_type, "item_no": select_item}
 
@@ -76,9 +75,64 @@ def used_item(db: Session, item_no: int, recipient_no: int, current_user: User):
 
         db_additional_goal = AdditionalGoal(ADDITIONAL_NM=person_goal.PERSON_NM, CHALLENGE_USER_NO=recipient_no)
         db.add(db_additional_goal)
+        challenge_crud.update_challenge_user_stats(db, target_user, additional_failed_delta=1)
 
     db.commit()
 
     my_avatar = challenge_crud.get_equipped_avatar(db, current_user.USER_NO, AvatarType.CHARACTER).AVATAR_NO
 
     return {"message": "아이템 사용 성공", "item_no": item_no, "character_no": my_avatar}
+
+
+# 최근 24시간 동안 받은 확인하지 않은 아이템 로그를 보낸 유저 정보/캐릭터와 함께 한 번의 쿼리로 조회
+async def get_item_logs(db: AsyncSession, recipient_no: int):
+    twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
+
+    result = await db.execute(select(
+        ItemLog.ITEM_NO,
+        ItemLog.ITEM_LOG_NO,
+        ItemLog.INSERT_DT,
+        User.USER_NM,
+        AvatarUser.AVATAR_NO
+    ).join(
+        ChallengeUser, ChallengeUser.CHALLENGE_USER_NO == ItemLog.SENDER_NO
+    ).join(
+        User, User.USER_NO == ChallengeUser.USER_NO
+    ).outerjoin(
+        AvatarUser, and_(
+            AvatarUser.USER_NO == User.USER_NO,
+            AvatarUser.IS_EQUIP == True,
+            AvatarUser.AVATAR_NO.in_(select(Avatar.AVATAR_NO).where(Avatar.AVATAR_TYPE == AvatarType.CHARACTER))
+        )
+    ).where(
+        ItemLog.RECIPIENT_NO == recipient_no,
+        ItemLog.IS_VIEW == False,
+        ItemLog.INSERT_DT >= twenty_four_hours_ago,  # INSERT_DT가 최근 24시간 이내
+    ).order_by(ItemLog.ITEM_LOG_NO))
+    item_logs = result.all()
+
+    return [
+        {"ITEM_NO": item_log.ITEM_NO, "ITEM_LOG_NO": item_log.ITEM_LOG_NO, "INSERT_DT": item_log.INSERT_DT,
+         "send_USER_NM": item_log.USER_NM, "send_CHARACTER_NO": item_log.AVATAR_NO}
+        for item_log in item_logs
+    ]
+
+
+# 현재 유저가 받은 아이템 로그를 한 번에 확인 처리
+# challenge_mst_no가 있으면 해당 챌린지만, until_item_log_no가 있으면 그 번호까지만 처리 (조회 이후 도착한 로그는 유지)
+def view_item_logs(db: Session, current_user: User, challenge_mst_no: int = None, until_item_log_no: int = None):
+    recipients = select(ChallengeUser.CHALLENGE_USER_NO).where(ChallengeUser.USER_NO == current_user.USER_NO)
+    if challenge_mst_no is not None:
+        recipients = recipients.where(ChallengeUser.CHALLENGE_MST_NO == challenge_mst_no)
+
+    query = update(ItemLog).where(
+        ItemLog.RECIPIENT_NO.in_(recipients),
+        ItemLog.IS_VIEW == False
+    )
+    if until_item_log_no is not None:
+        query = query.where(ItemLog.ITEM_LOG_NO <= until_item_log_no)
+
+    result = db.execute(query.values(IS_VIEW=True).execution_options(synchronize_session=False))
+    db.commit()
+
+    return result.rowcount
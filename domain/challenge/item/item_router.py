@@ -1,13 +1,14 @@
-from datetime import datetime, timedelta
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, get_async_db
 from domain.challenge import challenge_crud
-from domain.challenge.item.item_crud import used_item, get_item
-from domain.user.user_crud import get_current_user, get_equipped_avatar
-from models import User, ChallengeMaster, ChallengeStatusType, ChallengeUser, ItemUser, ItemLog, AvatarType
+from domain.challenge.item.item_crud import used_item, get_item, get_item_logs, view_item_logs
+from domain.user.user_crud import get_current_user, get_current_user_async
+from models import User, ItemLog
 
 router = APIRouter(
     prefix="/item",
@@ -32,30 +33,25 @@ def use_item(item_no: int, recipient_no: int, db: Session = Depends(get_db),
 
 
 @router.get("/log/{challenge_mst_no}")
-def get_item_log(challenge_mst_no: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    challenge_user = challenge_crud.get_challenge_user_by_user_no(db, challenge_mst_no, current_user.USER_NO)
+async def get_item_log(challenge_mst_no: int, db: AsyncSession = Depends(get_async_db),
+                       current_user: User = Depends(get_current_user_async)):
+    challenge_user = await challenge_crud.get_challenge_user_by_user_no_async(db, challenge_mst_no,
+                                                                              current_user.USER_NO)
 
-    twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
+    item_log_data = await get_item_logs(db, challenge_user.CHALLENGE_USER_NO)
 
-    item_logs = db.query(ItemLog).filter(
-        ItemLog.RECIPIENT_NO == challenge_user.CHALLENGE_USER_NO,
-        ItemLog.IS_VIEW == False,
-        ItemLog.INSERT_DT >= twenty_four_hours_ago,  # INSERT_DT가 최근 24시간 이내
-    ).all()
+    return item_log_data
 
-    item_log_data = []
 
-    for item_log in item_logs:
-        send_user = item_log.sender.USER
-        character = get_equipped_avatar(db, send_user.USER_NO, AvatarType.CHARACTER)
-        item_log_data.append(
-            {"ITEM_NO": item_log.ITEM_NO, "ITEM_LOG_NO": item_log.ITEM_LOG_NO, "INSERT_DT": item_log.INSERT_DT,
-             "send_USER_NM": send_user.USER_NM, "send_CHARACTER_NO": character.AVATAR_NO})
+@router.put("/log")
+def update_item_logs(challenge_mst_no: Optional[int] = None, until_item_log_no: Optional[int] = None,
+                     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    count = view_item_logs(db, current_user, challenge_mst_no, until_item_log_no)
 
-    return item_log_data
+    return {"message": "update 성공", "count": count}
 
 
-@router.put("/log/{item_log_no}")
+@router.put("/log/{item_log_no}", deprecated=True)  # PUT /item/log 로 대체
 def update_item_log(item_log_no: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     item_log = db.query(ItemLog).filter(ItemLog.ITEM_LOG_NO == item_log_no).first()
 
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import namedtuple
+
+from starlette.config import Config
+
+from database import SessionLocal
+from models import Item, Avatar
+
+config = Config('.env')
+CATALOG_MAX_AGE = config('CATALOG_MAX_AGE', cast=int, default=600)  # 다른 워커에서 변경된 내용도 이 시간 안에 반영
+
+CatalogItem = namedtuple('CatalogItem', ['ITEM_NO', 'ITEM_NM'])
+CatalogAvatar = namedtuple('CatalogAvatar', ['AVATAR_NO', 'AVATAR_NM', 'AVATAR_TYPE'])
+
+
+# 거의 변하지 않는 Item/Avatar 테이블을 프로세스 내에 불변 튜플로 보관
+class Catalog:
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+        self.version = 0
+        self.loaded_at = None
+        self._items = ()
+        self._avatars = ()
+        self._lock = threading.Lock()
+
+    def reload(self, db=None):
+        session = db or SessionLocal()
+        try:
+            items = tuple(CatalogItem(item.ITEM_NO, item.ITEM_NM)
+                          for item in session.query(Item).order_by(Item.ITEM_NO).all())
+            avatars = tuple(CatalogAvatar(avatar.AVATAR_NO, avatar.AVATAR_NM, avatar.AVATAR_TYPE)
+                            for avatar in session.query(Avatar).order_by(Avatar.AVATAR_NO).all())
+        finally:
+            if db is None:
+                session.close()
+
+        with self._lock:
+            self._items = items
+            self._avatars = avatars
+            self.version += 1
+            self.loaded_at = time.monotonic()
+
+        return self.version
+
+    def _ensure_loaded(self):
+        loaded_at = self.loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.max_age:
+            self.reload()
+
+    def get_items(self):
+        self._ensure_loaded()
+        return self._items
+
+    def get_avatars(self):
+        self._ensure_loaded()
+        return self._avatars
+
+    # 번호로 아바타 조회 (캐시에 없으면 새로 추가된 아바타일 수 있으므로 한 번 다시 불러옴)
+    def get_avatar(self, avatar_no: int):
+        for _ in range(2):
+            avatar = next((avatar for avatar in self.get_avatars() if avatar.AVATAR_NO == avatar_no), None)
+            if avatar:
+                return avatar
+            self.reload()
+
+        return None
+
+    def stats(self):
+        return {"version": self.version, "items": len(self._items), "avatars": len(self._avatars),
+                "age": time.monotonic() - self.loaded_at if self.loaded_at is not None else None}
+
+
+catalog = Catalog(CATALOG_MAX_AGE)
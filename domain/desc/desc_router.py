@@ -1,8 +1,9 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, BackgroundTasks
 
-from database import upload_file
+from database import upload_file, create_presigned_upload, get_file_url
+from domain.desc.utils import generate_image_variants, verify_image_type, verify_uploaded_image, MAX_IMAGE_SIZE
 from domain.user.user_crud import get_current_user
 from models import User
 
@@ -13,14 +14,17 @@ router = APIRouter(
 )
 
 
-@router.post("/upload/image")
-async def upload_image(_current_user: User = Depends(get_current_user), image_file: UploadFile = File(...)):
-    # 이미지 형식만 허용
-    if image_file.content_type not in ["image/jpeg", "image/png"]:
-        raise HTTPException(status_code=400, detail="Unsupported file type.")
+# 고유 파일 이름 생성
+def make_file_name(uid: int, file_extension: str):
+    current_time = datetime.now().strftime("%Y%m%d%H%M%S")
+    return f"{uid}_{current_time}.{file_extension}"
 
-    # 이미지 크기 제한 (예: 5MB)
-    max_size = 5 * 1024 * 1024  # 5MB
+
+@router.post("/upload/image")
+async def upload_image(background_tasks: BackgroundTasks, _current_user: User = Depends(get_current_user),
+                       image_file: UploadFile = File(...)):
+    file_extension = image_file.filename.split(".")[-1].lower()
+    verify_image_type(image_file.content_type, file_extension)
 
     # 파일의 현재 위치 확인 (파일 크기)
     image_file.file.seek(0, 2)  # 파일의 끝으로 이동
@@ -28,14 +32,39 @@ async def upload_image(_current_user: User = Depends(get_current_user), image_fi
     image_file.file.seek(0)  # 파일 포인터를 다시 시작 위치로 이동
 
     # 파일 크기가 최대 크기를 초과하면 오류 발생
-    if file_size > max_size:
+    if file_size > MAX_IMAGE_SIZE:
         raise HTTPException(status_code=413, detail="File is too large.")
 
-    # 고유 파일 이름 생성
-    current_time = datetime.now().strftime("%Y%m%d%H%M%S")
-    file_extension = image_file.filename.split(".")[-1]
-    file_name = f"{_current_user.UID}_{current_time}.{file_extension}"
+    file_name = make_file_name(_current_user.UID, file_extension)
 
     # 파일 업로드 및 URL 획득
     file_url = await upload_file(file_name, image_file)
-    return {"url": file_url, "fileName": file_name}
\ No newline at end of file
+
+    # 썸네일 등 변형 이미지는 응답 이후 생성
+    image_file.file.seek(0)
+    background_tasks.add_task(generate_image_variants, file_name, await image_file.read())
+
+    return {"url": file_url, "fileName": file_name}
+
+
+# 클라이언트가 S3로 직접 업로드할 수 있도록 presigned POST 발급
+@router.post("/upload/presigned")
+def create_presigned_image_upload(content_type: str, file_extension: str,
+                                 _current_user: User = Depends(get_current_user)):
+    verify_image_type(content_type, file_extension)
+
+    file_name = make_file_name(_current_user.UID, file_extension.lower())
+    presigned = create_presigned_upload(file_name, content_type, MAX_IMAGE_SIZE)
+
+    return {"url": presigned["url"], "fields": presigned["fields"], "fileName": file_name}
+
+
+# 직접 업로드된 파일이 실제로 존재하는지 확인 (create_diary, complete_additional_goal 호출 전)
+@router.post("/upload/confirm")
+def confirm_image_upload(file_name: str, background_tasks: BackgroundTasks,
+                         _current_user: User = Depends(get_current_user)):
+    verify_uploaded_image(file_name, _current_user.UID)
+
+    background_tasks.add_task(generate_image_variants, file_name)
+
+    return {"url": get_file_url(file_name), "fileName": file_name}
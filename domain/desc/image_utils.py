@@ -0,0 +1,38 @@
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# 변형 이미지 종류와 최대 변 길이(px)
+IMAGE_VARIANTS = {
+    "thumb": 256,
+    "medium": 720,
+    "full": 1600,
+}
+
+
+# 원본 파일 이름으로부터 변형 이미지 파일 이름 생성 ({UID}_{timestamp}_{variant}.webp)
+def get_variant_file_name(file_name: str, variant: str):
+    base_name = file_name.rsplit(".", 1)[0]
+    return f"{base_name}_{variant}.webp"
+
+
+# 원본 이미지로부터 WebP 변형 이미지 생성 (프로세스 풀에서 실행)
+# EXIF의 회전 정보는 픽셀에 반영하고, 저장 시 EXIF 등 메타데이터는 포함하지 않음
+def create_image_variants(data: bytes):
+    variants = {}
+
+    with Image.open(BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        for variant, max_size in IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((max_size, max_size))
+
+            buffer = BytesIO()
+            resized.save(buffer, format="WEBP", quality=80, method=4)
+            variants[variant] = (buffer.getvalue(), resized.width, resized.height)
+
+    return variants
@@ -1,10 +1,32 @@
+import asyncio
 import enum
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import random
 
-from sqlalchemy import not_
+from fastapi import HTTPException
+from sqlalchemy import exists, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from starlette.concurrency import run_in_threadpool
+from starlette.config import Config
 
-from models import Item, AvatarUser, Avatar
+from database import SessionLocal, upload_bytes, download_file, get_file_url, s3_upload_executor, get_uploaded_file
+from domain.desc.catalog import catalog
+from domain.desc.image_utils import create_image_variants, get_variant_file_name, IMAGE_VARIANTS
+from models import AvatarUser, Avatar, ImageVariant, NicknameCounter, User
+
+config = Config('.env')
+IMAGE_PROCESS_WORKERS = config('IMAGE_PROCESS_WORKERS', cast=int, default=2)
+
+# 허용하는 이미지 형식과 형식별 확장자
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ["jpg", "jpeg"],
+    "image/png": ["png"],
+}
+
+# 이미지 크기 제한 (예: 5MB)
+MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
 
 
 def calculate_challenge_progress(start_dt, end_dt):
@@ -40,6 +62,27 @@ def random_user():
     return username
 
 
+# 겹치지 않는 닉네임 발급 ("형용사 콩 번호")
+# 조합별 카운터를 한 번의 UPSERT로 증가시키므로 동시 가입에도 같은 번호가 발급되지 않고, 잠금은 같은 조합끼리만 경합
+def allocate_nickname(db_session):
+    prefix = random_user()
+
+    while True:
+        counter = pg_insert(NicknameCounter).values(PREFIX=prefix, LAST_NO=1)
+        last_no = db_session.execute(
+            counter.on_conflict_do_update(
+                index_elements=[NicknameCounter.PREFIX],
+                set_={"LAST_NO": NicknameCounter.LAST_NO + 1}
+            ).returning(NicknameCounter.LAST_NO)
+        ).scalar()
+
+        nickname = f"{prefix} {last_no}"
+
+        # 유저가 직접 같은 이름으로 바꾼 경우에만 다음 번호로 넘어감
+        if not db_session.query(User.USER_NO).filter(func.lower(User.USER_NM) == nickname.lower()).first():
+            return nickname
+
+
 class RewardType(enum.Enum):
     AVATAR = "Avatar"
     ITEM = "Item"
@@ -57,8 +100,8 @@ def select_randomly_with_probability(avatar, item, nothing, duration):
 
 
 def get_random_item(db_session):
-    # Item 테이블에서 모든 요소 가져오기
-    items = db_session.query(Item).all()
+    # 캐시된 Item 목록 가져오기
+    items = catalog.get_items()
 
     if not items:
         return None  # 아이템이 없는 경우
@@ -68,17 +111,158 @@ def get_random_item(db_session):
     return random_item
 
 
+# 유저가 소유하지 않은 아바타 조건 (anti-join)
+def not_owned_by_user(user_no):
+    return ~exists().where(AvatarUser.AVATAR_NO == Avatar.AVATAR_NO, AvatarUser.USER_NO == user_no)
+
+
 def get_random_avatar_not_owned_by_user(db_session, user_no):
-    # 유저가 소유한 악세사리의 목록을 가져옴
-    owned_avatars = db_session.query(AvatarUser.AVATAR_NO).filter(AvatarUser.USER_NO == user_no).all()
-    owned_avatars_ids = [avatar.AVATAR_NO for avatar in owned_avatars]
+    # 유저가 소유하지 않은 악세사리 중 하나를 DB에서 바로 선택
+    random_avatar = db_session.query(Avatar.AVATAR_NO, Avatar.AVATAR_NM, Avatar.AVATAR_TYPE).filter(
+        not_owned_by_user(user_no)
+    ).order_by(func.random()).limit(1).first()
+
+    return random_avatar  # 사용자가 모든 악세사리를 소유하고 있거나 사용 가능한 악세사리가 없는 경우 None
+
+
+# 소유하지 않은 아바타 중 하나를 골라 지급 (선택과 지급을 INSERT ... SELECT 한 번으로 처리)
+# 같은 유저에 대한 지급은 유저 행 잠금으로 순서대로 처리해 같은 아바타가 중복 지급되지 않음
+def grant_random_avatar(db_session, user_no):
+    db_session.execute(select(User.USER_NO).where(User.USER_NO == user_no).with_for_update())
 
-    # 유저가 소유하지 않은 악세사리를 찾음
-    available_avatars = db_session.query(Avatar).filter(not_(Avatar.AVATAR_NO.in_(owned_avatars_ids))).all()
+    random_avatar = select(Avatar.AVATAR_NO, literal(user_no), literal(False)).where(
+        not_owned_by_user(user_no)
+    ).order_by(func.random()).limit(1)
 
-    if not available_avatars:
+    avatar_no = db_session.execute(
+        insert(AvatarUser).from_select(["AVATAR_NO", "USER_NO", "IS_EQUIP"], random_avatar)
+        .returning(AvatarUser.AVATAR_NO)
+    ).scalar()
+
+    if avatar_no is None:
         return None  # 사용자가 모든 악세사리를 소유하고 있거나 사용 가능한 악세사리가 없는 경우
 
-    # 랜덤하게 하나의 악세사리 선택
-    random_avatar = random.choice(available_avatars)
-    return random_avatar
+    return catalog.get_avatar(avatar_no)
+
+
+# 이미지 형식과 확장자가 허용된 조합인지 확인
+def verify_image_type(content_type: str, file_extension: str):
+    if content_type not in IMAGE_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported file type.")
+
+    if file_extension.lower() not in IMAGE_EXTENSIONS[content_type]:
+        raise HTTPException(status_code=400, detail="Unsupported file extension.")
+
+
+# 유저가 업로드한 이미지가 S3에 실제로 존재하고 제한을 지키는지 확인 (DB에 파일 이름을 저장하기 전)
+def verify_uploaded_image(file_name: str, uid: int):
+    if not file_name.startswith(f"{uid}_"):
+        raise HTTPException(status_code=401, detail="업로드 권한이 없는 파일입니다.")
+
+    uploaded_file = get_uploaded_file(file_name)
+
+    if not uploaded_file:
+        raise HTTPException(status_code=404, detail="업로드된 파일을 찾을 수 없습니다.")
+
+    verify_image_type(uploaded_file.get("ContentType"), file_name.rsplit(".", 1)[-1])
+
+    if uploaded_file.get("ContentLength", 0) > MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=413, detail="File is too large.")
+
+    return uploaded_file
+
+
+# 이미지 리사이즈/인코딩은 CPU 작업이므로 요청 처리와 분리된 프로세스 풀에서 수행 (처음 사용할 때 생성)
+_image_process_executor = None
+_image_process_executor_lock = threading.Lock()
+
+
+def get_image_process_executor():
+    global _image_process_executor
+    with _image_process_executor_lock:
+        if _image_process_executor is None:
+            _image_process_executor = ProcessPoolExecutor(max_workers=IMAGE_PROCESS_WORKERS)
+        return _image_process_executor
+
+
+# 원본 이미지의 변형 이미지가 모두 만들어져 있는지 확인
+def has_image_variants(file_name: str):
+    db = SessionLocal()
+    try:
+        variant_count = db.query(func.count(ImageVariant.IMAGE_VARIANT_NO)).filter(
+            ImageVariant.IMAGE_FILE_NM == file_name,
+            ImageVariant.VARIANT.in_(list(IMAGE_VARIANTS))
+        ).scalar()
+    finally:
+        db.close()
+
+    return variant_count == len(IMAGE_VARIANTS)
+
+
+# 변형 이미지를 S3에 올리고 기록 (동시에 생성된 경우 먼저 기록된 값을 유지)
+def save_image_variants(file_name: str, variants: dict):
+    db = SessionLocal()
+    try:
+        for variant, (variant_data, width, height) in variants.items():
+            variant_file_name = get_variant_file_name(file_name, variant)
+            upload_bytes(variant_file_name, variant_data, "image/webp")
+
+            db.execute(pg_insert(ImageVariant).values(
+                IMAGE_FILE_NM=file_name, VARIANT=variant, VARIANT_FILE_NM=variant_file_name,
+                WIDTH=width, HEIGHT=height, INSERT_DT=datetime.utcnow()
+            ).on_conflict_do_nothing(index_elements=[ImageVariant.IMAGE_FILE_NM, ImageVariant.VARIANT]))
+        db.commit()
+    finally:
+        db.close()
+
+
+# 업로드된 이미지의 WebP 변형(thumb/medium/full)을 생성해 S3에 올리고 기록 (응답 이후 백그라운드에서 실행)
+# 이미 생성된 이미지는 다시 내려받거나 변환하지 않음
+async def generate_image_variants(file_name: str, data: bytes = None):
+    if await run_in_threadpool(has_image_variants, file_name):
+        return
+
+    loop = asyncio.get_running_loop()
+    if data is None:
+        data = await loop.run_in_executor(s3_upload_executor, download_file, file_name)
+
+    variants = await loop.run_in_executor(get_image_process_executor(), create_image_variants, data)
+
+    await run_in_threadpool(save_image_variants, file_name, variants)
+
+
+# 원본 이미지들의 변형 이미지를 찾는 쿼리 (동기/비동기 공용)
+def select_image_variants(file_names):
+    return select(ImageVariant).where(ImageVariant.IMAGE_FILE_NM.in_(file_names))
+
+
+# 원본 이미지들의 변형 이미지 URL을 한 번에 가져오기 (IMAGE_FILE_NM -> {variant: url})
+def get_image_variant_urls(db_session, file_names):
+    file_names = [file_name for file_name in file_names if file_name]
+    if not file_names:
+        return {}
+
+    image_variants = db_session.execute(select_image_variants(file_names)).scalars().all()
+
+    return build_image_variant_urls(image_variants)
+
+
+# 원본 이미지들의 변형 이미지 URL을 한 번에 가져오기 (비동기)
+async def get_image_variant_urls_async(db_session, file_names):
+    file_names = [file_name for file_name in file_names if file_name]
+    if not file_names:
+        return {}
+
+    result = await db_session.execute(select_image_variants(file_names))
+
+    return build_image_variant_urls(result.scalars().all())
+
+
+# ImageVariant 목록을 IMAGE_FILE_NM -> {variant: url} 형태로 변환
+def build_image_variant_urls(image_variants):
+    variant_urls = {}
+    for image_variant in image_variants:
+        variant_urls.setdefault(image_variant.IMAGE_FILE_NM, {})[image_variant.VARIANT] = \
+            get_file_url(image_variant.VARIANT_FILE_NM)
+
+    return variant_urls
@@ -0,0 +1,52 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from starlette.config import Config
+
+from database import get_pool_status
+from domain.challenge.challenge_scheduler import scheduler_metrics
+from domain.desc.catalog import catalog
+from domain.user.friend_crud import friend_cache
+from domain.user.user_crud import user_cache
+
+config = Config('.env')
+INTERNAL_API_KEY = config('INTERNAL_API_KEY', default=None)
+
+
+# 내부용 API 키 확인 (INTERNAL_API_KEY가 설정되지 않은 경우 내부 API 전체를 막음)
+def verify_internal_key(x_internal_key: Optional[str] = Header(None)):
+    if not INTERNAL_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if not x_internal_key or not secrets.compare_digest(x_internal_key, INTERNAL_API_KEY):
+        raise HTTPException(status_code=403, detail="내부 API 접근 권한이 없습니다.")
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(verify_internal_key)],
+    include_in_schema=False
+)
+
+
+@router.get("/db/pool")
+def db_pool_status():
+    return get_pool_status()
+
+
+@router.get("/cache")
+def cache_status():
+    return {"user": user_cache.stats(), "friend": friend_cache.stats(), "catalog": catalog.stats()}
+
+
+@router.post("/catalog/reload")
+def reload_catalog():
+    version = catalog.reload()
+    return {"message": "카탈로그 갱신 완료", "version": version}
+
+
+@router.get("/scheduler")
+def scheduler_status():
+    return scheduler_metrics
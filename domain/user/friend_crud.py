@@ -0,0 +1,296 @@
+from collections import namedtuple
+from datetime import datetime
+from typing import Optional, List
+
+from sqlalchemy import and_, case, func, literal, or_, select, union_all, exists, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from starlette.config import Config
+
+from database import SessionLocal
+from domain.desc.cache import TTLCache
+from models import User, Friend, InviteAcceptType, ChallengeUser, ChallengeMaster, FriendSuggestion
+
+config = Config('.env')
+FRIEND_CACHE_TTL = config('FRIEND_CACHE_TTL', cast=int, default=60)
+FRIEND_CACHE_SIZE = config('FRIEND_CACHE_SIZE', cast=int, default=10000)
+FRIEND_SUGGESTION_SIZE = config('FRIEND_SUGGESTION_SIZE', cast=int, default=20)  # 유저별로 저장하는 추천 수
+
+# 추천 점수 = 함께 아는 친구 수 * MUTUAL_FRIEND_WEIGHT + 함께 참여한 챌린지 수 * CO_CHALLENGE_WEIGHT
+MUTUAL_FRIEND_WEIGHT = 2
+CO_CHALLENGE_WEIGHT = 1
+
+FriendEdge = namedtuple('FriendEdge', ['FRIEND_NO', 'ACCEPT_STATUS', 'SENDER_NO'])
+
+# 유저별 친구 관계 (USER_NO -> {상대 USER_NO: FriendEdge}), 변경 시 양쪽 유저 모두 무효화
+# 다른 워커의 변경은 TTL 안에 반영됨
+friend_cache = TTLCache(maxsize=FRIEND_CACHE_SIZE, ttl=FRIEND_CACHE_TTL)
+
+
+# 두 유저 사이의 관계 조회 (방향과 무관하게 (작은 번호, 큰 번호) 유니크 인덱스 사용)
+def get_friend_by_users(db: Session, user_no: int, other_user_no: int):
+    return db.query(Friend).filter(
+        Friend.USER_LOW_NO == min(user_no, other_user_no),
+        Friend.USER_HIGH_NO == max(user_no, other_user_no)
+    ).first()
+
+
+# 유저의 모든 친구 관계 (상대 USER_NO -> FriendEdge)
+def get_friend_edges(db: Session, user_no: int):
+    edges = friend_cache.get(user_no)
+    if edges is not None:
+        return edges
+
+    friends = db.query(Friend.FRIEND_NO, Friend.ACCEPT_STATUS, Friend.SENDER_NO, Friend.RECIPIENT_NO).filter(
+        or_(Friend.USER_LOW_NO == user_no, Friend.USER_HIGH_NO == user_no)
+    ).all()
+
+    edges = {
+        (friend.RECIPIENT_NO if friend.SENDER_NO == user_no else friend.SENDER_NO):
+            FriendEdge(friend.FRIEND_NO, friend.ACCEPT_STATUS, friend.SENDER_NO)
+        for friend in friends
+    }
+    friend_cache.set(user_no, edges)
+    return edges
+
+
+# 수락된 친구의 USER_NO 목록
+def get_friend_user_nos(db: Session, user_no: int):
+    return [friend_user_no for friend_user_no, edge in get_friend_edges(db, user_no).items()
+            if edge.ACCEPT_STATUS == InviteAcceptType.ACCEPTED]
+
+
+def invalidate_friend_cache(*user_nos: int):
+    for user_no in user_nos:
+        friend_cache.delete(user_no)
+
+
+# 현재 유저 기준 친구 목록에 보이는 관계 (수락된 친구 + 내가 받은 대기중 요청, 거절/삭제 제외)
+def visible_friend_conditions(user_no: int):
+    return [
+        or_(Friend.SENDER_NO == user_no, Friend.RECIPIENT_NO == user_no),
+        or_(
+            Friend.ACCEPT_STATUS == InviteAcceptType.ACCEPTED,
+            and_(Friend.ACCEPT_STATUS == InviteAcceptType.PENDING, Friend.RECIPIENT_NO == user_no)
+        )
+    ]
+
+
+# 친구 목록 조회 (상대 유저를 CASE 조인으로 한 번에 가져오고 FRIEND_NO 기준 keyset 페이지네이션)
+async def get_friend_list(db: AsyncSession, user_no: int, status: Optional[InviteAcceptType] = None,
+                          cursor: int = None, limit: int = None):
+    friend_user_no = case((Friend.SENDER_NO == user_no, Friend.RECIPIENT_NO), else_=Friend.SENDER_NO)
+    relation = case((Friend.ACCEPT_STATUS == InviteAcceptType.ACCEPTED, literal("accepted")), else_=literal("pending"))
+
+    query = select(
+        Friend.FRIEND_NO,
+        relation.label("RELATION"),
+        User.UID,
+        User.USER_NM
+    ).join(
+        User, User.USER_NO == friend_user_no
+    ).where(*visible_friend_conditions(user_no))
+
+    if status is not None:
+        query = query.where(Friend.ACCEPT_STATUS == status)
+    if cursor is not None:
+        query = query.where(Friend.FRIEND_NO > cursor)
+
+    query = query.order_by(Friend.FRIEND_NO)
+    if limit is not None:
+        # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+        query = query.limit(limit + 1)
+
+    friends = (await db.execute(query)).all()
+
+    next_cursor = None
+    if limit is not None and len(friends) > limit:
+        friends = friends[:limit]
+        next_cursor = friends[-1].FRIEND_NO
+
+    friend_list = {"pending": [], "accepted": [], "next_cursor": next_cursor}
+    for friend in friends:
+        friend_list[friend.RELATION].append({
+            "UID": friend.UID,
+            "USER_NM": friend.USER_NM,
+            "FRIEND_NO": friend.FRIEND_NO
+        })
+
+    return friend_list
+
+
+# 친구 목록 개수만 조회
+async def count_friends(db: AsyncSession, user_no: int):
+    result = await db.execute(select(
+        func.count(Friend.FRIEND_NO).filter(Friend.ACCEPT_STATUS == InviteAcceptType.PENDING),
+        func.count(Friend.FRIEND_NO).filter(Friend.ACCEPT_STATUS == InviteAcceptType.ACCEPTED)
+    ).where(*visible_friend_conditions(user_no)))
+    pending, accepted = result.one()
+
+    return {"pending": pending, "accepted": accepted}
+
+
+# 유저들의 친구 추천 후보 (2촌 친구 + 같은 챌린지 참가자) 점수 계산 후 유저별 상위 FRIEND_SUGGESTION_SIZE개
+def select_friend_suggestions(user_nos: List[int]):
+    accepted = Friend.ACCEPT_STATUS == InviteAcceptType.ACCEPTED
+
+    # 수락된 친구 관계를 양방향으로 펼침
+    edges = union_all(
+        select(Friend.USER_LOW_NO.label("USER_NO"), Friend.USER_HIGH_NO.label("FRIEND_USER_NO")).where(accepted),
+        select(Friend.USER_HIGH_NO, Friend.USER_LOW_NO).where(accepted)
+    ).cte("edges")
+    first_hop = edges.alias("first_hop")
+    second_hop = edges.alias("second_hop")
+
+    mutual_friends = select(
+        first_hop.c.USER_NO,
+        second_hop.c.FRIEND_USER_NO.label("CANDIDATE_NO"),
+        func.count(func.distinct(first_hop.c.FRIEND_USER_NO)).label("MUTUAL_COUNT"),
+        literal(0).label("CHALLENGE_COUNT")
+    ).select_from(first_hop).join(
+        second_hop, second_hop.c.USER_NO == first_hop.c.FRIEND_USER_NO
+    ).where(
+        first_hop.c.USER_NO.in_(user_nos),
+        second_hop.c.FRIEND_USER_NO != first_hop.c.USER_NO
+    ).group_by(first_hop.c.USER_NO, second_hop.c.FRIEND_USER_NO)
+
+    challenge_user = aliased(ChallengeUser)
+    co_challenge_user = aliased(ChallengeUser)
+    co_challenges = select(
+        challenge_user.USER_NO,
+        co_challenge_user.USER_NO.label("CANDIDATE_NO"),
+        literal(0).label("MUTUAL_COUNT"),
+        func.count(func.distinct(challenge_user.CHALLENGE_MST_NO)).label("CHALLENGE_COUNT")
+    ).select_from(challenge_user).join(
+        ChallengeMaster, ChallengeMaster.CHALLENGE_MST_NO == challenge_user.CHALLENGE_MST_NO
+    ).join(
+        co_challenge_user, and_(
+            co_challenge_user.CHALLENGE_MST_NO == challenge_user.CHALLENGE_MST_NO,
+            co_challenge_user.USER_NO != challenge_user.USER_NO
+        )
+    ).where(
+        challenge_user.USER_NO.in_(user_nos),
+        challenge_user.ACCEPT_STATUS == InviteAcceptType.ACCEPTED,
+        co_challenge_user.ACCEPT_STATUS == InviteAcceptType.ACCEPTED,
+        ChallengeMaster.DELETE_YN == False
+    ).group_by(challenge_user.USER_NO, co_challenge_user.USER_NO)
+
+    candidates = union_all(mutual_friends, co_challenges).subquery("candidates")
+    scored = select(
+        candidates.c.USER_NO,
+        candidates.c.CANDIDATE_NO,
+        func.sum(candidates.c.MUTUAL_COUNT).label("MUTUAL_COUNT"),
+        func.sum(candidates.c.CHALLENGE_COUNT).label("CHALLENGE_COUNT")
+    ).group_by(candidates.c.USER_NO, candidates.c.CANDIDATE_NO).subquery("scored")
+
+    score = scored.c.MUTUAL_COUNT * MUTUAL_FRIEND_WEIGHT + scored.c.CHALLENGE_COUNT * CO_CHALLENGE_WEIGHT
+
+    # 이미 친구이거나 요청/거절 이력이 있는 유저, 비활성 유저 제외
+    ranked = select(
+        scored.c.USER_NO,
+        scored.c.CANDIDATE_NO,
+        score.label("SCORE"),
+        scored.c.MUTUAL_COUNT,
+        scored.c.CHALLENGE_COUNT,
+        func.row_number().over(partition_by=scored.c.USER_NO,
+                               order_by=(score.desc(), scored.c.CANDIDATE_NO)).label("RANK")
+    ).join(
+        User, User.USER_NO == scored.c.CANDIDATE_NO
+    ).where(
+        User.DISABLE_YN.isnot(True),
+        ~exists().where(
+            Friend.USER_LOW_NO == func.least(scored.c.USER_NO, scored.c.CANDIDATE_NO),
+            Friend.USER_HIGH_NO == func.greatest(scored.c.USER_NO, scored.c.CANDIDATE_NO),
+            Friend.ACCEPT_STATUS != InviteAcceptType.DELETED
+        )
+    ).subquery("ranked")
+
+    return select(
+        ranked.c.USER_NO, ranked.c.CANDIDATE_NO, ranked.c.SCORE, ranked.c.MUTUAL_COUNT, ranked.c.CHALLENGE_COUNT,
+        literal(datetime.utcnow())
+    ).where(ranked.c.RANK <= FRIEND_SUGGESTION_SIZE)
+
+
+# 유저들의 친구 추천 목록을 다시 계산해 저장 (커밋은 호출하는 쪽에서)
+# 같은 유저의 갱신이 동시에 실행되면 상대가 먼저 넣은 행과 겹칠 수 있으므로 UPSERT로 저장
+def refresh_friend_suggestions(db: Session, user_nos: List[int]):
+    if not user_nos:
+        return 0
+
+    db.execute(delete(FriendSuggestion).where(FriendSuggestion.USER_NO.in_(user_nos)))
+    stmt = pg_insert(FriendSuggestion).from_select(
+        ["USER_NO", "SUGGESTED_USER_NO", "SCORE", "MUTUAL_COUNT", "CHALLENGE_COUNT", "INSERT_DT"],
+        select_friend_suggestions(user_nos)
+    )
+    result = db.execute(stmt.on_conflict_do_update(
+        index_elements=[FriendSuggestion.USER_NO, FriendSuggestion.SUGGESTED_USER_NO],
+        set_={
+            "SCORE": stmt.excluded.SCORE,
+            "MUTUAL_COUNT": stmt.excluded.MUTUAL_COUNT,
+            "CHALLENGE_COUNT": stmt.excluded.CHALLENGE_COUNT,
+            "INSERT_DT": stmt.excluded.INSERT_DT
+        }
+    ))
+
+    return result.rowcount
+
+
+# 전체 유저의 친구 추천 목록 재계산 (USER_NO 순서로 청크마다 커밋)
+def rebuild_friend_suggestions(db: Session, chunk_size: int = 500):
+    last_user_no = 0
+    total = 0
+
+    while True:
+        user_nos = [user_no for user_no, in db.query(User.USER_NO).filter(
+            User.USER_NO > last_user_no,
+            User.DISABLE_YN.isnot(True)
+        ).order_by(User.USER_NO).limit(chunk_size).all()]
+
+        if not user_nos:
+            break
+
+        total += refresh_friend_suggestions(db, user_nos)
+        db.commit()
+        last_user_no = user_nos[-1]
+
+    return total
+
+
+# 친구 수락 시 추천 목록이 바뀌는 유저들(두 유저와 각자의 친구들)만 다시 계산
+def refresh_friend_suggestions_for_friendship(user_no: int, other_user_no: int):
+    db = SessionLocal()
+    try:
+        affected_user_nos = {user_no, other_user_no}
+        affected_user_nos.update(get_friend_user_nos(db, user_no))
+        affected_user_nos.update(get_friend_user_nos(db, other_user_no))
+
+        refresh_friend_suggestions(db, list(affected_user_nos))
+        db.commit()
+    finally:
+        db.close()
+
+
+# 저장된 친구 추천 목록 조회 (추천 이후 친구 요청/수락된 유저는 제외)
+def get_friend_suggestions(db: Session, user_no: int, limit: int = FRIEND_SUGGESTION_SIZE):
+    suggestions = db.query(
+        FriendSuggestion.SUGGESTED_USER_NO,
+        FriendSuggestion.MUTUAL_COUNT,
+        FriendSuggestion.CHALLENGE_COUNT,
+        User.UID,
+        User.USER_NM
+    ).join(
+        User, User.USER_NO == FriendSuggestion.SUGGESTED_USER_NO
+    ).filter(
+        FriendSuggestion.USER_NO == user_no
+    ).order_by(FriendSuggestion.SCORE.desc(), FriendSuggestion.SUGGESTED_USER_NO).limit(limit).all()
+
+    edges = get_friend_edges(db, user_no)
+
+    return [
+        {"UID": suggestion.UID, "USER_NM": suggestion.USER_NM, "MUTUAL_COUNT": suggestion.MUTUAL_COUNT,
+         "CHALLENGE_COUNT": suggestion.CHALLENGE_COUNT}
+        for suggestion in suggestions
+        if suggestion.SUGGESTED_USER_NO not in edges
+        or edges[suggestion.SUGGESTED_USER_NO].ACCEPT_STATUS == InviteAcceptType.DELETED
+    ]
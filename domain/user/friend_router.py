@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import or_
+from datetime import datetime
+from typing import Optional, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database import get_db
-from domain.user import user_crud
-from domain.user.friend_schema import FriendListResponse
-from domain.user.user_crud import get_current_user
+from database import get_db, get_async_db
+from domain.user import user_crud, friend_crud
+from domain.user.friend_schema import FriendListResponse, FriendCountResponse, FriendSuggestionInfo
+from domain.user.user_crud import get_current_user, get_current_user_async
 from models import User, Friend, InviteAcceptType
 
 router = APIRouter(
@@ -19,64 +23,71 @@ def invite_friend(uid: int, db: Session = Depends(get_db),
                   current_user: User = Depends(get_current_user)):
     recipient_user = user_crud.get_user_by_uid(db, uid)
 
-    # 이미 친구 요청이 존재하는지 확인
-    existing_request = db.query(Friend).filter(
-        or_(
-            (Friend.SENDER_NO == current_user.USER_NO) & (Friend.RECIPIENT_NO == recipient_user.USER_NO),
-            (Friend.SENDER_NO == recipient_user.USER_NO) & (Friend.RECIPIENT_NO == current_user.USER_NO)
-        ),
-        Friend.ACCEPT_STATUS != InviteAcceptType.DECLINED
-    ).first()
-    if existing_request:
-        if existing_request.ACCEPT_STATUS == InviteAcceptType.ACCEPTED:
+    if recipient_user.USER_NO == current_user.USER_NO:
+        raise HTTPException(status_code=400, detail="자신에게 친구요청을 보낼 수 없습니다.")
+
+    # 이미 친구 요청이 존재하는지 확인 (두 유저 사이에는 하나의 관계만 존재)
+    db_friend = friend_crud.get_friend_by_users(db, current_user.USER_NO, recipient_user.USER_NO)
+    if db_friend:
+        if db_friend.ACCEPT_STATUS == InviteAcceptType.ACCEPTED:
             raise HTTPException(status_code=404, detail="이미 친구인 상태입니다.")
 
-        if existing_request.ACCEPT_STATUS == InviteAcceptType.PENDING:
+        if db_friend.ACCEPT_STATUS == InviteAcceptType.PENDING:
             raise HTTPException(status_code=404, detail="이미 친구요청이 보내진 상태입니다.")
 
-    # 새로운 친구 요청 생성
-    db_friend = Friend(SENDER_NO=current_user.USER_NO, RECIPIENT_NO=recipient_user.USER_NO)
-    db.add(db_friend)
-    db.commit()
+        # 거절/삭제된 관계는 새 요청으로 재사용
+        db_friend.SENDER_NO = current_user.USER_NO
+        db_friend.RECIPIENT_NO = recipient_user.USER_NO
+        db_friend.ACCEPT_STATUS = InviteAcceptType.PENDING
+        db_friend.INSERT_DT = datetime.utcnow()
+        db_friend.ACCEPT_DT = None
+    else:
+        # 새로운 친구 요청 생성
+        db_friend = Friend(SENDER_NO=current_user.USER_NO, RECIPIENT_NO=recipient_user.USER_NO)
+        db.add(db_friend)
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # 동시에 서로 요청을 보낸 경우 (user pair 유니크 제약)
+        db.rollback()
+        raise HTTPException(status_code=404, detail="이미 친구요청이 보내진 상태입니다.")
+    friend_crud.invalidate_friend_cache(current_user.USER_NO, recipient_user.USER_NO)
 
     return {"message": "친구요청 성공!", "FRIEND_NO": db_friend.FRIEND_NO}
 
 
 @router.get("/list", response_model=FriendListResponse)
-def get_friend_list(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # 친구 목록 조회
-    friend_records = db.query(Friend).filter(
-        or_(Friend.SENDER_NO == current_user.USER_NO, Friend.RECIPIENT_NO == current_user.USER_NO)
-    ).all()
-
-    # 각 상태에 따른 친구 목록 필터링 및 필요한 정보 추출
-    pending_friends = []
-    accepted_friends = []
-
-    for record in friend_records:
-        # 친구의 사용자 번호 확인
-        friend_user_no = record.RECIPIENT_NO if record.SENDER_NO == current_user.USER_NO else record.SENDER_NO
-        friend_user = db.query(User).filter(User.USER_NO == friend_user_no).first()
-
-        if friend_user:
-            friend_data = {
-                "UID": friend_user.UID,
-                "USER_NM": friend_user.USER_NM,
-                "FRIEND_NO": record.FRIEND_NO  # 친구의 사용자 번호 추가
-            }
-            # PENDING 상태이고, 현재 사용자가 수신자인 경우
-            if record.ACCEPT_STATUS == InviteAcceptType.PENDING and record.RECIPIENT_NO == current_user.USER_NO:
-                pending_friends.append(friend_data)
-            # ACCEPTED 상태인 경우
-            elif record.ACCEPT_STATUS == InviteAcceptType.ACCEPTED:
-                accepted_friends.append(friend_data)
-
-    return {"pending": pending_friends, "accepted": accepted_friends}
+async def get_friend_list(status: Optional[InviteAcceptType] = Query(None, description="PENDING 또는 ACCEPTED만 조회"),
+                          cursor: Optional[int] = Query(None, description="이전 응답의 next_cursor"),
+                          limit: Optional[int] = Query(None, ge=1, le=100, description="한 번에 가져올 친구 수"),
+                          db: AsyncSession = Depends(get_async_db),
+                          current_user: User = Depends(get_current_user_async)):
+    friend_list = await friend_crud.get_friend_list(db, current_user.USER_NO, status, cursor, limit)
+
+    return friend_list
+
+
+@router.get("/count", response_model=FriendCountResponse)
+async def get_friend_count(db: AsyncSession = Depends(get_async_db),
+                           current_user: User = Depends(get_current_user_async)):
+    friend_count = await friend_crud.count_friends(db, current_user.USER_NO)
+
+    return friend_count
+
+
+@router.get("/suggestions", response_model=List[FriendSuggestionInfo])
+def get_friend_suggestions(limit: int = Query(friend_crud.FRIEND_SUGGESTION_SIZE, ge=1,
+                                              le=friend_crud.FRIEND_SUGGESTION_SIZE, description="추천 유저 수"),
+                           db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    suggestions = friend_crud.get_friend_suggestions(db, current_user.USER_NO, limit)
+
+    return suggestions
 
 
 @router.put("/{friend_no}")
-def update_friend(friend_no: int, status: InviteAcceptType, db: Session = Depends(get_db),
-                  current_user: User = Depends(get_current_user)):
+def update_friend(friend_no: int, status: InviteAcceptType, background_tasks: BackgroundTasks,
+                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     friend = db.query(Friend).filter(Friend.FRIEND_NO == friend_no).first()
 
     if not friend:
@@ -88,5 +99,11 @@ def update_friend(friend_no: int, status: InviteAcceptType, db: Session = Depend
     friend.ACCEPT_STATUS = status
 
     db.commit()
+    friend_crud.invalidate_friend_cache(friend.SENDER_NO, friend.RECIPIENT_NO)
+
+    # 새 친구 관계로 바뀌는 추천 목록 갱신
+    if status == InviteAcceptType.ACCEPTED:
+        background_tasks.add_task(friend_crud.refresh_friend_suggestions_for_friendship,
+                                  friend.SENDER_NO, friend.RECIPIENT_NO)
 
     return {"message": "친구상태 업데이트 성공"}
@@ -11,3 +11,16 @@ class FriendInfo(BaseModel):
 class FriendListResponse(BaseModel):
     pending: List[FriendInfo]
     accepted: List[FriendInfo]
+    next_cursor: Optional[int] = None
+
+
+class FriendCountResponse(BaseModel):
+    pending: int
+    accepted: int
+
+
+class FriendSuggestionInfo(BaseModel):
+    UID: int
+    USER_NM: str
+    MUTUAL_COUNT: int
+    CHALLENGE_COUNT: int
@@ -1,16 +1,20 @@
 from collections import Counter
+from typing import List
 
 from fastapi import Depends, HTTPException
 from jose import jwt, JWTError, ExpiredSignatureError
-from sqlalchemy import or_
+from sqlalchemy import or_, select, inspect, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.config import Config
 
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from database import get_db
+from database import get_db, get_async_db
 from domain.challenge import challenge_crud
-from domain.desc.utils import random_user
+from domain.desc.cache import TTLCache
+from domain.desc.utils import allocate_nickname
 from domain.user.user_schema import CreateUser, UpdateUser, GetUser
 from models import User, SignType, UserSetting, AvatarUser, ChallengeStatusType, AvatarType, Avatar, ChallengeMaster, \
     ChallengeUser, InviteAcceptType
@@ -24,13 +28,23 @@ ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/docs/login")
 
+USER_CACHE_TTL = config('USER_CACHE_TTL', cast=int, default=60)
+USER_CACHE_SIZE = config('USER_CACHE_SIZE', cast=int, default=10000)
+USER_SNAPSHOT_KEYS = [attr.key for attr in inspect(User).column_attrs]
+
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+# 가입 시 닉네임이 겹친 경우 다시 발급받는 횟수
+NICKNAME_RETRY_COUNT = 3
+USER_NM_UNIQUE_INDEX = 'uq_user_user_nm_lower'
+
 
 # 기능 함수
 # EMAIL과 ID_TOKEN의 중복 확인
 def check_user_email_id_token_duplicate(db: Session, user_email: str, id_token: str, current_user_id: int = None):
     query_conditions = []
     if user_email:
-        query_conditions.append(User.USER_EMAIL == user_email)
+        query_conditions.append(func.lower(User.USER_EMAIL) == func.lower(user_email))
     if id_token:
         query_conditions.append(User.ID_TOKEN == id_token)
 
@@ -40,26 +54,32 @@ def check_user_email_id_token_duplicate(db: Session, user_email: str, id_token:
     existing_user = db.query(User).filter(or_(*query_conditions)).first()
 
     if existing_user:
-        if user_email and existing_user.USER_EMAIL == user_email:
+        if user_email and existing_user.USER_EMAIL and existing_user.USER_EMAIL.lower() == user_email.lower():
             raise HTTPException(status_code=400, detail="입력된 USER_EMAIL가 이미 존재합니다.")
         if id_token and existing_user.ID_TOKEN == id_token:
             raise HTTPException(status_code=400, detail="입력된 ID_TOKEN가 이미 존재합니다.")
 
 
+# 닉네임 중복 확인 (대소문자 구분 없음, lower(USER_NM) 유니크 인덱스 사용)
 def check_duplicate_user_nm(db: Session, user_nm: str, current_user_id: int = None):
-    query_conditions = [User.USER_NM == user_nm]
+    query_conditions = [func.lower(User.USER_NM) == func.lower(user_nm)]
 
     if current_user_id:
         query_conditions.append(User.USER_NO != current_user_id)
 
-    existing_user = db.query(User).filter(*query_conditions).first()
+    existing_user = db.query(User.USER_NO).filter(*query_conditions).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="해당 닉네임은 이미 사용 중입니다.")
 
 
+# UID로 활성 유저를 찾는 쿼리 (동기/비동기 공용)
+def select_user_by_uid(uid: int):
+    return select(User).where(User.UID == uid, User.DISABLE_YN == False)
+
+
 # UID를 통해서 유저 반환
 def get_user_by_uid(db: Session, uid: int):
-    user = db.query(User).filter(User.UID == uid, User.DISABLE_YN == False).first()
+    user = db.execute(select_user_by_uid(uid)).scalars().first()
     if not user:
         raise HTTPException(status_code=401, detail="UID로 부터 사용자를 찾을 수 없습니다.")
 
@@ -77,9 +97,8 @@ def encode_token(sub: str, is_exp: bool):
     return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
 
 
-# 현재 AccessToken의 유저 반환
-def get_current_user(token: str = Depends(oauth2_scheme),
-                     db: Session = Depends(get_db)):
+# AccessToken 검증 후 UID 반환
+def decode_access_token(token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except ExpiredSignatureError:
@@ -93,7 +112,60 @@ def get_current_user(token: str = Depends(oauth2_scheme),
     if uid is None:
         raise HTTPException(status_code=401, detail="토큰값으로부터 UID 정보를 찾을 수 없습니다.")
 
+    return uid
+
+
+# 캐시에 저장할 유저 컬럼 값 추출 (UID -> 컬럼 값 형태로 저장)
+def snapshot_user(user: User):
+    return {key: getattr(user, key) for key in USER_SNAPSHOT_KEYS}
+
+
+# 캐시된 값으로 DB 조회 없이 User 객체 복원 (세션에 merge 후 사용)
+def restore_user(snapshot: dict):
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_user_cache(uid: int):
+    user_cache.delete(uid)
+
+
+# 현재 AccessToken의 유저 반환
+def get_current_user(token: str = Depends(oauth2_scheme),
+                     db: Session = Depends(get_db)):
+    uid = decode_access_token(token)
+
+    snapshot = user_cache.get(uid)
+    if snapshot:
+        return db.merge(restore_user(snapshot), load=False)
+
     user = get_user_by_uid(db, uid=uid)
+    user_cache.set(uid, snapshot_user(user))
+    return user
+
+
+# UID를 통해서 유저 반환 (비동기)
+async def get_user_by_uid_async(db: AsyncSession, uid: int):
+    result = await db.execute(select_user_by_uid(uid))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=401, detail="UID로 부터 사용자를 찾을 수 없습니다.")
+
+    return user
+
+
+# 현재 AccessToken의 유저 반환 (비동기)
+async def get_current_user_async(token: str = Depends(oauth2_scheme),
+                                 db: AsyncSession = Depends(get_async_db)):
+    uid = decode_access_token(token)
+
+    snapshot = user_cache.get(uid)
+    if snapshot:
+        return await db.merge(restore_user(snapshot), load=False)
+
+    user = await get_user_by_uid_async(db, uid=uid)
+    user_cache.set(uid, snapshot_user(user))
     return user
 
 
@@ -107,16 +179,36 @@ def refresh_token(token: str = Depends(oauth2_scheme), db: Session = Depends(get
     user = get_user_by_uid(db, uid)
     user.RECENT_LOGIN_DT = datetime.utcnow()
     db.commit()
+    invalidate_user_cache(user.UID)
 
     return user
 
 
 # 라우터 함수
-def create_user(user: CreateUser, db: Session):
-    db_user = User(USER_NM=random_user(), SIGN_TYPE=user.SIGN_TYPE, USER_EMAIL=user.USER_EMAIL)
+# 위반된 제약조건(인덱스) 이름
+def get_violated_constraint(error: IntegrityError):
+    return getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+
+
+# 새 닉네임을 발급받아 유저 저장
+# 발급 직후 다른 유저가 같은 닉네임으로 변경한 경우에만 새로 발급받아 다시 시도하고, 그 외 충돌은 이메일 중복
+def insert_new_user(db: Session, user: CreateUser):
+    for _ in range(NICKNAME_RETRY_COUNT):
+        db_user = User(USER_NM=allocate_nickname(db), SIGN_TYPE=user.SIGN_TYPE, USER_EMAIL=user.USER_EMAIL)
+        db.add(db_user)
+        try:
+            db.commit()
+            return db_user
+        except IntegrityError as e:
+            db.rollback()
+            if get_violated_constraint(e) != USER_NM_UNIQUE_INDEX:
+                raise HTTPException(status_code=400, detail="입력된 USER_EMAIL가 이미 존재합니다.")
+
+    raise HTTPException(status_code=409, detail="닉네임을 발급하지 못했습니다. 다시 시도해주세요.")
 
-    db.add(db_user)
-    db.commit()
+
+def create_user(user: CreateUser, db: Session):
+    db_user = insert_new_user(db, user)
 
     db_user_setting = UserSetting(
         USER_NO=db_user.USER_NO,
@@ -134,14 +226,10 @@ def create_user(user: CreateUser, db: Session):
 
 
 def social_login(user: CreateUser, db: Session):
-    existing_user = db.query(User).filter(User.USER_EMAIL == user.USER_EMAIL).first()
+    existing_user = db.query(User).filter(func.lower(User.USER_EMAIL) == func.lower(user.USER_EMAIL)).first()
 
     if not existing_user:
-        db_user = User(USER_NM=random_user(), SIGN_TYPE=user.SIGN_TYPE,
-                       USER_EMAIL=user.USER_EMAIL)
-
-        db.add(db_user)
-        db.commit()
+        db_user = insert_new_user(db, user)
 
         db_user_setting = UserSetting(
             USER_NO=db_user.USER_NO,
@@ -162,7 +250,8 @@ def social_login(user: CreateUser, db: Session):
 
 
 def update_user(user: UpdateUser, db: Session, current_user: User):
-    check_duplicate_user_nm(db, user.USER_NM)
+    if user.USER_NM is not None and user.USER_NM != current_user.USER_NM:
+        check_duplicate_user_nm(db, user.USER_NM, current_user.USER_NO)
 
     if user.USER_EMAIL is not None and user.ID_TOKEN is not None:
         check_user_email_id_token_duplicate(db, user.USER_EMAIL, user.ID_TOKEN, current_user.USER_NO)
@@ -176,7 +265,13 @@ def update_user(user: UpdateUser, db: Session, current_user: User):
     if user.ID_TOKEN is not None:
         current_user.ID_TOKEN = user.ID_TOKEN
 
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 확인 이후 다른 요청이 같은 닉네임/이메일을 먼저 저장한 경우
+        db.rollback()
+        raise HTTPException(status_code=400, detail="해당 닉네임 또는 이메일은 이미 사용 중입니다.")
+    invalidate_user_cache(current_user.UID)
 
     return {"message": "업데이트 성공"}
 
@@ -219,3 +314,49 @@ def get_equipped_avatar(db: Session, user_no: int, avatar_type: AvatarType):
         raise HTTPException(status_code=404, detail="CHARACTER 정보를 찾을 수 없습니다.")
 
     return avatar
+
+
+# 여러 유저의 착용중인 아바타를 한 번에 가져오기 ((USER_NO, AVATAR_TYPE) -> AVATAR_NO)
+async def get_equipped_avatars(db: AsyncSession, user_nos: List[int]):
+    if not user_nos:
+        return {}
+
+    result = await db.execute(
+        select(AvatarUser.USER_NO, AvatarUser.AVATAR_NO, Avatar.AVATAR_TYPE)
+        .join(Avatar, Avatar.AVATAR_NO == AvatarUser.AVATAR_NO)
+        .where(
+            AvatarUser.USER_NO.in_(user_nos),
+            AvatarUser.IS_EQUIP == True
+        )
+    )
+    rows = result.all()
+
+    equipped_avatars = {}
+    for row in rows:
+        equipped_avatars.setdefault((row.USER_NO, row.AVATAR_TYPE), row.AVATAR_NO)
+
+    return equipped_avatars
+
+
+# LIKE 패턴 문자 이스케이프
+def escape_like(keyword: str):
+    return keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# 닉네임으로 유저 검색 (접두어 일치 우선, 그 다음 부분 일치, pg_trgm 인덱스 사용)
+async def search_users_by_nickname(db: AsyncSession, keyword: str, limit: int = 10):
+    keyword = escape_like(keyword.lower())
+    user_nm = func.lower(User.USER_NM)
+
+    result = await db.execute(
+        select(User.UID, User.USER_NM).where(
+            user_nm.like(f"%{keyword}%", escape="\\"),
+            User.DISABLE_YN == False
+        ).order_by(
+            user_nm.like(f"{keyword}%", escape="\\").desc(),
+            func.length(User.USER_NM),
+            User.USER_NM
+        ).limit(limit)
+    )
+
+    return [{"UID": uid, "USER_NM": nickname} for uid, nickname in result.all()]
@@ -1,13 +1,17 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_async_db
 from domain.user import user_crud, user_schema
-from domain.user.user_crud import encode_token, get_current_user, refresh_token, get_equipped_avatar
+from domain.user.user_crud import encode_token, get_current_user, refresh_token, get_equipped_avatar, \
+    get_current_user_async, invalidate_user_cache
 from domain.user.user_schema import CreateUser, UpdateUser, GetUser, GetUserSetting, \
     UpdateUserSetting
 from models import User, AvatarUser, Avatar, UserSetting, SignType
@@ -35,7 +39,7 @@ def create_user(user_data: CreateUser, db: Session = Depends(get_db)):
     # print(user_data)
     user = None
     if user_data.SIGN_TYPE != SignType.GUEST:
-        user = db.query(User).filter(User.USER_EMAIL == user_data.USER_EMAIL).first()
+        user = db.query(User).filter(func.lower(User.USER_EMAIL) == func.lower(user_data.USER_EMAIL)).first()
 
     if not user:
         user = user_crud.create_user(user_data, db)
@@ -87,10 +91,16 @@ def delete_user(db: Session = Depends(get_db), current_user: User = Depends(get_
     current_user.DISABLE_YN = True
     current_user.DISABLE_DT = datetime.utcnow()
 
+    # 같은 이메일로 가입했던 계정이 여러 번 탈퇴해도 겹치지 않도록 UID를 붙임 (lower(USER_EMAIL) 유니크 인덱스)
     if current_user.USER_EMAIL:
-        current_user.USER_EMAIL = current_user.USER_EMAIL + "#disabled"
+        current_user.USER_EMAIL = f"{current_user.USER_EMAIL}#disabled#{current_user.UID}"
 
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="탈퇴 처리 중 이메일 정보가 충돌했습니다.")
+    invalidate_user_cache(current_user.UID)
 
     return {
         "UID": current_user.UID,
@@ -98,11 +108,23 @@ def delete_user(db: Session = Depends(get_db), current_user: User = Depends(get_
     }
 
 
+@router.get("/search")
+async def search_users(keyword: str = Query(..., min_length=1, max_length=30, description="닉네임 검색어"),
+                       limit: int = Query(10, ge=1, le=20),
+                       db: AsyncSession = Depends(get_async_db),
+                       current_user: User = Depends(get_current_user_async)):
+    users = await user_crud.search_users_by_nickname(db, keyword, limit)
+
+    return users
+
+
 @router.get("/search/{uid}")
-def search_user(uid: int, db: Session = Depends(get_db)):
+async def search_user(uid: int, db: AsyncSession = Depends(get_async_db)):
     # user = user_crud.get_user_by_uid(db, uid)
 
-    user = db.query(User).filter(User.UID == uid, User.DISABLE_YN == False).first()
+    # 필요한 컬럼만 조회 (ix_user_uid_covering 인덱스만으로 응답)
+    result = await db.execute(select(User.UID, User.USER_NM).where(User.UID == uid, User.DISABLE_YN == False))
+    user = result.first()
     if not user:
         return {"USER_NM": None, "UID": None}
 
@@ -110,13 +132,15 @@ def search_user(uid: int, db: Session = Depends(get_db)):
 
 
 @router.get("/avatar")
-def get_avatars(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_avatars(db: AsyncSession = Depends(get_async_db),
+                      current_user: User = Depends(get_current_user_async)):
     # AvatarUser와 Avatar 조인하여 쿼리
-    query = db.query(Avatar, AvatarUser). \
+    query = select(Avatar, AvatarUser). \
         outerjoin(AvatarUser, (AvatarUser.AVATAR_NO == Avatar.AVATAR_NO) & (AvatarUser.USER_NO == current_user.USER_NO))
+    result = await db.execute(query)
 
     avatars = []
-    for avatar, avatar_user in query.all():
+    for avatar, avatar_user in result.all():
         avatars.append({
             "IS_EQUIP": avatar_user.IS_EQUIP if avatar_user else False,
             "AVATAR_NO": avatar.AVATAR_NO,
@@ -156,13 +180,16 @@ def set_equipped_avatars(avatar_nos: List[int], db: Session = Depends(get_db),
         avatar_user.IS_EQUIP = True
 
     db.commit()
+    invalidate_user_cache(current_user.UID)
 
     return {"message": "착용된 아바타 변경 성공"}
 
 
 @router.get("/setting", response_model=GetUserSetting)
-def get_user_setting(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    user_setting = db.query(UserSetting).filter(UserSetting.USER_NO == current_user.USER_NO).first()
+async def get_user_setting(db: AsyncSession = Depends(get_async_db),
+                           current_user: User = Depends(get_current_user_async)):
+    result = await db.execute(select(UserSetting).where(UserSetting.USER_NO == current_user.USER_NO))
+    user_setting = result.scalars().first()
 
     return GetUserSetting(
         NOTICE_PUSH_YN=user_setting.NOTICE_PUSH_YN,
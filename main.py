@@ -1,18 +1,16 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
-
 from fastapi import FastAPI, Depends
-from pytz import timezone
+from starlette.config import Config
 
-from database import get_db, SessionLocal
 from domain.challenge import challenge_router
 from domain.challenge.additional import additional_router
-from domain.challenge.challenge_crud import start_challenge_server, end_challenge_server
+from domain.challenge.challenge_scheduler import create_scheduler, start_scheduler, shutdown_scheduler
 from domain.challenge.diary import diary_router
 from domain.challenge.item import item_router
 from domain.desc import desc_router
+from domain.internal import internal_router
 from domain.user import user_router, friend_router
-from models import ChallengeStatusType, ChallengeMaster
+
+config = Config('.env')
 
 app = FastAPI()
 
@@ -37,40 +35,22 @@ app.include_router(diary_router.router)
 app.include_router(additional_router.router)
 app.include_router(item_router.router)
 app.include_router(desc_router.router)
+app.include_router(internal_router.router)
 
-scheduler = BackgroundScheduler()
-scheduler.configure(timezone=timezone('Asia/Seoul'))
-
-
-def check_and_start_challenges():
-    db = SessionLocal()  # 직접 세션 생성
-    try:
-        current_date = datetime.utcnow()
-        challenges_to_start = db.query(ChallengeMaster).filter(
-            ChallengeMaster.START_DT <= current_date,
-            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PENDING,
-            ChallengeMaster.DELETE_YN == False,
-        ).all()
-
-        for challenge in challenges_to_start:
-            start_challenge_server(db, challenge)
-
-        challenges_to_end = db.query(ChallengeMaster).filter(
-            ChallengeMaster.END_DT <= current_date,
-            ChallengeMaster.CHALLENGE_STATUS == ChallengeStatusType.PROGRESS,
-            ChallengeMaster.DELETE_YN == False,
-        ).all()
+# 스케줄러는 전용 워커(scheduler.py)에서 실행, API 프로세스에서는 기본적으로 띄우지 않음
+# 워커 없이 단일 프로세스로 운영하는 경우에만 RUN_SCHEDULER=true
+RUN_SCHEDULER = config('RUN_SCHEDULER', cast=bool, default=False)
 
-        for challenge in challenges_to_end:
-            end_challenge_server(db, challenge)
+scheduler = create_scheduler() if RUN_SCHEDULER else None
 
-        db.commit()
-    finally:
-        db.close()  # 세션 닫기
 
+@app.on_event("startup")
+def on_startup():
+    if scheduler:
+        start_scheduler(scheduler)
 
-# 스케줄러에 작업 추가
-scheduler.add_job(check_and_start_challenges, 'cron', hour=4, minute=00)
 
-# 스케줄러 시작
-scheduler.start()
+@app.on_event("shutdown")
+def on_shutdown():
+    if scheduler:
+        shutdown_scheduler(scheduler)
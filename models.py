@@ -1,7 +1,8 @@
 import enum
 from datetime import datetime, timedelta
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum, ForeignKey, Sequence
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum, ForeignKey, Sequence, Float, Index, \
+    Computed, UniqueConstraint, func, text
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -38,6 +39,12 @@ class AvatarType(enum.Enum):
     PET = "PET"
 
 
+class JobStatusType(enum.Enum):
+    RUNNING = "RUNNING"
+    COMPLETE = "COMPLETE"
+    FAILED = "FAILED"
+
+
 class User(Base):
     __tablename__ = "user"
 
@@ -56,6 +63,16 @@ class User(Base):
 
     CHALLENGES = relationship('ChallengeUser', back_populates='USER')
 
+    __table_args__ = (
+        # 대소문자 구분 없이 닉네임/이메일 중복 방지
+        Index('uq_user_user_nm_lower', func.lower(USER_NM), unique=True),
+        Index('uq_user_user_email_lower', func.lower(USER_EMAIL), unique=True),
+        # 닉네임 검색 (접두어/부분 일치, pg_trgm)
+        Index('ix_user_user_nm_trgm', text('lower("USER_NM") gin_trgm_ops'), postgresql_using='gin'),
+        # UID 검색 시 테이블 접근 없이 인덱스만으로 응답
+        Index('ix_user_uid_covering', 'UID', postgresql_include=['USER_NM', 'DISABLE_YN']),
+    )
+
 
 class UserSetting(Base):
     __tablename__ = 'user_setting'
@@ -82,6 +99,17 @@ class Friend(Base):
     SENDER_NO = Column(Integer, ForeignKey('user.USER_NO'))
     RECIPIENT_NO = Column(Integer, ForeignKey('user.USER_NO'))
 
+    # 방향과 무관한 두 유저 쌍 (작은 번호, 큰 번호), 두 유저 사이에는 하나의 관계만 존재
+    USER_LOW_NO = Column(Integer, Computed('LEAST("SENDER_NO", "RECIPIENT_NO")'))
+    USER_HIGH_NO = Column(Integer, Computed('GREATEST("SENDER_NO", "RECIPIENT_NO")'))
+
+    __table_args__ = (
+        Index('ix_friend_sender_no', 'SENDER_NO'),
+        Index('ix_friend_recipient_no', 'RECIPIENT_NO'),
+        UniqueConstraint('USER_LOW_NO', 'USER_HIGH_NO', name='uq_friend_user_pair'),
+        Index('ix_friend_user_high_no', 'USER_HIGH_NO'),
+    )
+
 
 class Avatar(Base):
     __tablename__ = 'avatar'
@@ -99,6 +127,10 @@ class AvatarUser(Base):
     AVATAR_NO = Column(Integer, ForeignKey('avatar.AVATAR_NO'))
     USER_NO = Column(Integer, ForeignKey('user.USER_NO'))
 
+    __table_args__ = (
+        Index('ix_avatar_user_user_no_is_equip', 'USER_NO', 'IS_EQUIP'),
+    )
+
 
 class ChallengeMaster(Base):
     __tablename__ = 'challenge_master'
@@ -119,6 +151,11 @@ class ChallengeMaster(Base):
 
     USERS = relationship('ChallengeUser', back_populates='CHALLENGE_MST')
 
+    __table_args__ = (
+        Index('ix_challenge_master_status_start_dt', 'CHALLENGE_STATUS', 'START_DT'),
+        Index('ix_challenge_master_status_end_dt', 'CHALLENGE_STATUS', 'END_DT'),
+    )
+
 
 class ChallengeUser(Base):
     __tablename__ = 'challenge_users'
@@ -140,8 +177,10 @@ class ChallengeUser(Base):
     CHALLENGE_MST_NO = Column(Integer, ForeignKey('challenge_master.CHALLENGE_MST_NO'))
     CHALLENGE_MST = relationship('ChallengeMaster', back_populates='USERS')
 
-    # Index('ix_challenge_users_user_no', 'USER_NO')
-    # Index('ix_challenge_users_challenge_mst_no', 'CHALLENGE_MST_NO')
+    __table_args__ = (
+        Index('ix_challenge_users_user_no', 'USER_NO', 'CHALLENGE_MST_NO'),
+        Index('ix_challenge_users_challenge_mst_no', 'CHALLENGE_MST_NO'),
+    )
 
 
 class PersonDailyGoal(Base):
@@ -160,6 +199,11 @@ class PersonDailyGoal(Base):
     DAILY_COMPLETE = relationship('PersonDailyGoalComplete')
     DAILY_COMPLETE_NO = Column(Integer, ForeignKey('person_daily_goal_complete.DAILY_COMPLETE_NO'))
 
+    __table_args__ = (
+        Index('ix_person_daily_goal_challenge_user_no_insert_dt', 'CHALLENGE_USER_NO', 'INSERT_DT'),
+        Index('ix_person_daily_goal_daily_complete_no', 'DAILY_COMPLETE_NO'),
+    )
+
 
 # class TeamWeeklyGoal(Base):
 #     __tablename__ = 'team_weekly_goal'
@@ -194,6 +238,10 @@ class AdditionalGoal(Base):
     CHALLENGE_USER = relationship('ChallengeUser', backref="additional_goal")
     CHALLENGE_USER_NO = Column(Integer, ForeignKey('challenge_users.CHALLENGE_USER_NO'))
 
+    __table_args__ = (
+        Index('ix_additional_goal_challenge_user_no_end_dt', 'CHALLENGE_USER_NO', 'END_DT'),
+    )
+
 
 class PersonDailyGoalComplete(Base):
     __tablename__ = 'person_daily_goal_complete'
@@ -206,6 +254,10 @@ class PersonDailyGoalComplete(Base):
     CHALLENGE_USER = relationship('ChallengeUser', backref="person_daily_goal_complete")
     CHALLENGE_USER_NO = Column(Integer, ForeignKey('challenge_users.CHALLENGE_USER_NO'))
 
+    __table_args__ = (
+        Index('ix_person_daily_goal_complete_challenge_user_no_insert_dt', 'CHALLENGE_USER_NO', 'INSERT_DT'),
+    )
+
 
 class DailyCompleteUser(Base):
     __tablename__ = 'daily_complete_user'
@@ -217,6 +269,10 @@ class DailyCompleteUser(Base):
     CHALLENGE_USER = relationship('ChallengeUser', backref="daily_complete_user")
     CHALLENGE_USER_NO = Column(Integer, ForeignKey('challenge_users.CHALLENGE_USER_NO'))
 
+    __table_args__ = (
+        Index('ix_daily_complete_user_daily_complete_no', 'DAILY_COMPLETE_NO'),
+    )
+
 
 class Item(Base):
     __tablename__ = 'item'
@@ -236,6 +292,10 @@ class ItemUser(Base):
     CHALLENGE_USER = relationship('ChallengeUser', backref='item_users')
     CHALLENGE_USER_NO = Column(Integer, ForeignKey('challenge_users.CHALLENGE_USER_NO'))
 
+    __table_args__ = (
+        Index('ix_item_user_challenge_user_no_item_no', 'CHALLENGE_USER_NO', 'ITEM_NO'),
+    )
+
 
 class ItemLog(Base):
     __tablename__ = 'item_log'
@@ -252,3 +312,81 @@ class ItemLog(Base):
 
     sender = relationship('ChallengeUser', foreign_keys=[SENDER_NO])
     recipient = relationship('ChallengeUser', foreign_keys=[RECIPIENT_NO])
+
+    __table_args__ = (
+        Index('ix_item_log_recipient_no_is_view_insert_dt', 'RECIPIENT_NO', 'IS_VIEW', 'INSERT_DT'),
+    )
+
+
+class ChallengeUserStats(Base):
+    __tablename__ = 'challenge_user_stats'
+
+    CHALLENGE_USER_NO = Column(Integer, ForeignKey('challenge_users.CHALLENGE_USER_NO', ondelete='CASCADE'),
+                               primary_key=True)
+    DIARY_COUNT = Column(Integer, default=0, nullable=False)
+    ADDITIONAL_DONE_COUNT = Column(Integer, default=0, nullable=False)
+    ADDITIONAL_FAILED_COUNT = Column(Integer, default=0, nullable=False)
+    PROGRESS = Column(Float, default=0, nullable=False)
+
+    # 챌린지 종료 시점에 확정되는 최종 결과 (FINAL_DT가 있으면 이후 변경하지 않음)
+    RANK = Column(Integer)
+    PARTICIPANT_COUNT = Column(Integer)
+    FINAL_STATUS = Column(String)  # 종료 시점의 UserStatus 이름 (최근 7일 일기 개수 기준)
+    FINAL_DT = Column(DateTime)
+
+    MODIFY_DT = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ImageVariant(Base):
+    __tablename__ = 'image_variant'
+
+    IMAGE_VARIANT_NO = Column(Integer, primary_key=True)
+    IMAGE_FILE_NM = Column(String)
+    VARIANT = Column(String)
+    VARIANT_FILE_NM = Column(String)
+    WIDTH = Column(Integer)
+    HEIGHT = Column(Integer)
+
+    INSERT_DT = Column(DateTime, default=datetime.utcnow)
+
+    # 원본 이미지별 변형 종류는 하나만 (IMAGE_FILE_NM 조회에도 사용)
+    __table_args__ = (
+        UniqueConstraint('IMAGE_FILE_NM', 'VARIANT', name='uq_image_variant_image_file_nm_variant'),
+    )
+
+
+class SchedulerCheckpoint(Base):
+    __tablename__ = 'scheduler_checkpoint'
+
+    JOB_NM = Column(String, primary_key=True)
+    STATUS = Column(Enum(JobStatusType, name="JobStatusType"))
+    LAST_KEY = Column(Integer, default=0, nullable=False)  # 마지막으로 처리한 CHALLENGE_MST_NO
+    PROCESSED_COUNT = Column(Integer, default=0, nullable=False)
+    ERROR_MSG = Column(String)
+
+    START_DT = Column(DateTime)
+    END_DT = Column(DateTime)
+    MODIFY_DT = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class FriendSuggestion(Base):
+    __tablename__ = 'friend_suggestion'
+
+    USER_NO = Column(Integer, ForeignKey('user.USER_NO', ondelete='CASCADE'), primary_key=True)
+    SUGGESTED_USER_NO = Column(Integer, ForeignKey('user.USER_NO', ondelete='CASCADE'), primary_key=True)
+    SCORE = Column(Float, nullable=False)
+    MUTUAL_COUNT = Column(Integer, default=0, nullable=False)  # 함께 아는 친구 수
+    CHALLENGE_COUNT = Column(Integer, default=0, nullable=False)  # 함께 참여한 챌린지 수
+
+    INSERT_DT = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_friend_suggestion_user_no_score', 'USER_NO', 'SCORE'),
+    )
+
+
+class NicknameCounter(Base):
+    __tablename__ = 'nickname_counter'
+
+    PREFIX = Column(String, primary_key=True)  # "형용사 콩" 조합
+    LAST_NO = Column(Integer, default=0, nullable=False)  # 마지막으로 발급한 번호
@@ -0,0 +1,8 @@
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from domain.challenge.challenge_scheduler import create_scheduler, start_scheduler
+
+# API 서버와 별도로 실행하는 스케줄러 전용 워커
+# python scheduler.py
+if __name__ == '__main__':
+    start_scheduler(create_scheduler(BlockingScheduler))
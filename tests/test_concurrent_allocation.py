@@ -0,0 +1,129 @@
+import os
+import threading
+from unittest import mock
+
+import pytest
+from sqlalchemy import func, text
+
+# 실제 PostgreSQL의 잠금/UPSERT 동작을 확인하므로 비워둘 수 있는 테스트용 DB가 필요
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL(PostgreSQL)이 설정되지 않음")
+
+THREAD_COUNT = 16
+
+
+@pytest.fixture(scope="module")
+def app_modules():
+    pytest.importorskip("psycopg2")
+    pytest.importorskip("asyncpg")
+
+    os.environ["SQLALCHEMY_DATABASE_URL"] = TEST_DATABASE_URL
+    for key, value in {"S3_ACCESS_KEY": "test", "S3_SECRET_KEY": "test", "SECRET_KEY": "test",
+                       "ACCESS_TOKEN_EXPIRE_MINUTES": "60"}.items():
+        os.environ.setdefault(key, value)
+
+    import database
+    import models
+    from domain.desc import utils
+
+    with database.engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    models.Base.metadata.create_all(database.engine)
+
+    yield database, models, utils
+
+    models.Base.metadata.drop_all(database.engine)
+
+
+# 여러 스레드에서 동시에 같은 작업을 시작하고 결과를 모음
+def run_concurrently(database, work):
+    barrier = threading.Barrier(THREAD_COUNT)
+    results = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        db = database.SessionLocal()
+        try:
+            barrier.wait()
+            result = work(db)
+            db.commit()
+            with lock:
+                results.append(result)
+        except Exception as e:
+            db.rollback()
+            with lock:
+                errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREAD_COUNT)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    return results
+
+
+def test_allocate_nickname_is_unique_under_concurrent_sign_ups(app_modules):
+    database, models, utils = app_modules
+
+    def sign_up(db):
+        nickname = utils.allocate_nickname(db)
+        db.add(models.User(USER_NM=nickname, SIGN_TYPE=models.SignType.GUEST))
+        return nickname
+
+    # 모든 가입이 같은 조합을 뽑도록 고정해 카운터 경합을 만듦
+    with mock.patch.object(utils, "random_user", return_value="용감한 강낭콩"):
+        nicknames = run_concurrently(database, sign_up)
+
+    assert sorted(nicknames) == sorted(f"용감한 강낭콩 {no}" for no in range(1, THREAD_COUNT + 1))
+
+
+def test_allocate_nickname_skips_names_taken_by_rename(app_modules):
+    database, models, utils = app_modules
+
+    db = database.SessionLocal()
+    try:
+        db.add(models.User(USER_NM="느긋한 완두콩 1", SIGN_TYPE=models.SignType.GUEST))
+        db.commit()
+
+        with mock.patch.object(utils, "random_user", return_value="느긋한 완두콩"):
+            assert utils.allocate_nickname(db) == "느긋한 완두콩 2"
+        db.rollback()
+    finally:
+        db.close()
+
+
+def test_grant_random_avatar_never_grants_the_same_avatar_twice(app_modules):
+    database, models, utils = app_modules
+    avatar_count = THREAD_COUNT // 2
+
+    db = database.SessionLocal()
+    try:
+        user = models.User(USER_NM="아바타 테스트", SIGN_TYPE=models.SignType.GUEST)
+        db.add(user)
+        db.add_all([models.Avatar(AVATAR_NM=f"avatar {no}", AVATAR_TYPE=models.AvatarType.PET)
+                    for no in range(avatar_count)])
+        db.commit()
+        user_no = user.USER_NO
+    finally:
+        db.close()
+
+    granted = run_concurrently(database, lambda session: utils.grant_random_avatar(session, user_no))
+
+    granted_nos = [avatar.AVATAR_NO for avatar in granted if avatar is not None]
+    assert len(granted_nos) == avatar_count
+    assert len(set(granted_nos)) == avatar_count
+
+    db = database.SessionLocal()
+    try:
+        owned_count = db.query(func.count(models.AvatarUser.AVATAR_USER_NO)).filter(
+            models.AvatarUser.USER_NO == user_no).scalar()
+    finally:
+        db.close()
+
+    assert owned_count == avatar_count